@@ -7,41 +7,598 @@ Ensures code consistency, TypeScript compliance, and prevents common issues.
 import os
 import sys
 import json
+import time
+import zlib
+import errno
+import ctypes
+import ctypes.util
+import select
+import signal
+import struct
+import hashlib
+import fnmatch
+import threading
 import subprocess
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple
 import re
 
+# Bump whenever a per-file check changes what it reports, so cached results
+# from older versions are discarded
+CHECKER_VERSION = "4"
+
+SOURCE_SUFFIXES = {".ts", ".tsx", ".js", ".jsx"}
+# Extensions and index files tried, in TypeScript's order, to resolve a relative import
+RESOLVE_SUFFIXES = ["", ".ts", ".tsx", ".js", ".jsx", "/index.ts", "/index.tsx", "/index.js", "/index.jsx"]
+# Directories the project's lint script covers (`eslint src/ server/ --ext .ts,.tsx,.js`)
+LINT_DIRS = ("src/", "server/")
+LINT_SUFFIXES = (".ts", ".tsx", ".js")
+# Below this many files one ESLint process beats the cost of starting several
+ESLINT_SHARD_MIN_FILES = 200
+BACKUP_PATTERNS = ["*.backup", "*.bak", "*_backup.*"]
+
+# tsc --pretty false diagnostics: "src/App.tsx(12,5): error TS2322: Type ..."
+# or, for project-wide problems, just "error TS5023: Unknown compiler option ..."
+TSC_DIAGNOSTIC_RE = re.compile(r'^(?:(.+?)\((\d+),(\d+)\): )?(error|warning|suggestion|message) (TS\d+): (.*)$')
+TSC_WATCH_DONE_RE = re.compile(r'Found (\d+) errors?\b.*Watching for file changes')
+
+# One token per match in code: comments, string literals, identifiers, the
+# start of a template literal, or a single punctuation character. A quote only
+# starts a string where an expression can begin (see STRING_CONTEXT_*); in
+# JSX text such as <p>Don't click <A/> it's</p> it is a single character, as
+# is a quote that doesn't close on its line. A / in the same positions starts
+# a regex literal, so quotes and backticks inside one (/`/g) are not read.
+CODE_TOKEN_RE = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*")
+  | (?P<id>[A-Za-z_$][\w$]*)
+  | (?P<template>`)
+  | (?P<punct>\S)
+""", re.VERBOSE | re.DOTALL)
+# Tokens after which a quote opens a string literal; => is checked separately
+STRING_CONTEXT_PUNCT = set("=(,:[{?!&|+-*%<;~^")
+STRING_CONTEXT_WORDS = {
+    "return", "case", "from", "import", "export", "default", "in", "of", "typeof",
+    "yield", "await", "throw", "else", "as", "extends",
+}
+# A regex literal: classes may contain an unescaped /, and flags follow
+REGEX_LITERAL_RE = re.compile(r'/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\[\n])+/[A-Za-z]*')
+# Template literal text up to its closing backtick or the next ${
+TEMPLATE_TEXT_RE = re.compile(r'(?:\\.|[^`\\$]|\$(?!\{))*(?P<end>`|\$\{|\Z)', re.DOTALL)
+
+Token = Tuple[str, str, int]  # kind, text, offset
+
+def _expects_expression(tokens: List[Token], substitution_start: int) -> bool:
+    # True at the start of the file or of a ${ ... } substitution too
+    if not tokens or len(tokens) == substitution_start:
+        return True
+    kind, text, offset = tokens[-1]
+    if kind == "id":
+        return text in STRING_CONTEXT_WORDS
+    if kind != "punct":
+        return False
+    if text in STRING_CONTEXT_PUNCT:
+        return True
+    # An arrow function body: () => 'value'
+    return text == ">" and len(tokens) > 1 and tokens[-2][1] == "=" and tokens[-2][2] == offset - 1
+
+def tokenize(content: str) -> List[Token]:
+    """TS/TSX tokens in one pass; comments are dropped and template text skipped"""
+    tokens: List[Token] = []
+    # Brace depth inside each open ${ ... } of enclosing template literals
+    template_depths: List[int] = []
+    substitution_start = -1
+    pos = 0
+    in_template = False
+    length = len(content)
+    while pos < length:
+        if in_template:
+            match = TEMPLATE_TEXT_RE.match(content, pos)
+            pos = match.end()
+            in_template = False
+            if match.group("end") == "${":
+                template_depths.append(0)
+                substitution_start = len(tokens)
+            continue
+        match = CODE_TOKEN_RE.search(content, pos)
+        if match is None:
+            break
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "comment":
+            continue
+        if kind == "template":
+            in_template = True
+            continue
+        text = match.group()
+        if kind == "string" and not _expects_expression(tokens, substitution_start):
+            # Just an apostrophe or quote character in JSX text
+            kind, text = "punct", text[0]
+            pos = match.start() + 1
+        if text == "/" and kind == "punct" and _expects_expression(tokens, substitution_start):
+            # </ closes a JSX element rather than starting a regex
+            closing_tag = tokens and tokens[-1][1] == "<" and tokens[-1][2] == match.start() - 1
+            regex = None if closing_tag else REGEX_LITERAL_RE.match(content, match.start())
+            if regex is not None:
+                tokens.append(("regex", regex.group(), match.start()))
+                pos = regex.end()
+                continue
+        if kind == "punct" and template_depths:
+            if text == "{":
+                template_depths[-1] += 1
+            elif text == "}":
+                if template_depths[-1] == 0:
+                    # End of a ${ ... } substitution: back into the template text
+                    template_depths.pop()
+                    in_template = True
+                    continue
+                template_depths[-1] -= 1
+        tokens.append((kind, text, match.start()))
+    return tokens
+
+class ImportBinding:
+    """A local name introduced by an import declaration"""
+    
+    def __init__(self, local: str, imported: str, kind: str, type_only: bool, offset: int):
+        self.local = local
+        self.imported = imported  # "default", "*" or the exported name
+        self.kind = kind  # default, named or namespace
+        self.type_only = type_only
+        self.offset = offset  # of the local name
+
+def parse_imports(tokens: List[Token]) -> Tuple[List[ImportBinding], Set[int]]:
+    """Import bindings, and the indexes of every token inside an import declaration"""
+    bindings: List[ImportBinding] = []
+    inside: Set[int] = set()
+    i = 0
+    while i < len(tokens):
+        kind, text, _ = tokens[i]
+        next_text = tokens[i + 1][1] if i + 1 < len(tokens) else ""
+        previous = tokens[i - 1][1] if i > 0 else ";"
+        # import(...) and import.meta are expressions, and obj.import is a property
+        if kind != "id" or text != "import" or next_text in ("(", ".") or previous == ".":
+            i += 1
+            continue
+        start = i
+        i += 1
+        type_only = False
+        if i < len(tokens) and tokens[i][1] == "type" and tokens[i + 1:i + 2] and tokens[i + 1][1] not in (",", "from", "="):
+            type_only = True
+            i += 1
+        in_braces = False
+        pending: List[Token] = []  # identifiers of the current specifier
+        while i < len(tokens):
+            token_kind, token_text, token_offset = tokens[i]
+            if token_kind == "string" and not in_braces:
+                # The module specifier ends the declaration
+                i += 1
+                break
+            if token_text == "{":
+                in_braces = True
+            elif token_text in (",", "}") and in_braces:
+                binding = _named_binding(pending, type_only)
+                if binding is not None:
+                    bindings.append(binding)
+                pending = []
+                in_braces = token_text != "}"
+            elif in_braces and token_kind == "id":
+                pending.append(tokens[i])
+            elif token_kind == "id" and token_text not in ("from", "as"):
+                namespace = tokens[i - 1][1] == "as" and tokens[i - 2][1] == "*"
+                bindings.append(ImportBinding(
+                    token_text, "*" if namespace else "default",
+                    "namespace" if namespace else "default", type_only, token_offset
+                ))
+            elif token_text == ";" or (token_text == "=" and not in_braces):
+                # `import x = require(...)` is left to the compiler
+                break
+            i += 1
+        if i < len(tokens) and tokens[i][1] == ";":
+            i += 1
+        inside.update(range(start, i))
+    return bindings, inside
+
+def _named_binding(names: List[Token], type_only: bool) -> Optional[ImportBinding]:
+    # `A`, `A as B`, `type A` or `type A as B`
+    if len(names) > 1 and names[0][1] == "type":
+        names = names[1:]
+        type_only = True
+    if not names:
+        return None
+    _, local, offset = names[-1]
+    return ImportBinding(local, names[0][1], "named", type_only, offset)
+
+def identifier_index(content: str) -> Tuple[List[ImportBinding], Set[str]]:
+    """A file's import bindings and every identifier used outside import declarations"""
+    tokens = tokenize(content)
+    bindings, inside = parse_imports(tokens)
+    used = {text for index, (kind, text, _) in enumerate(tokens) if kind == "id" and index not in inside}
+    return bindings, used
+
+# Module specifiers of import/export-from statements, including multi-line ones
+IMPORT_FROM_RE = re.compile(r'^\s*(?:import|export)\b[^;]*?\bfrom\s*[\'"]([^\'"]+)[\'"]', re.MULTILINE)
+SIDE_EFFECT_IMPORT_RE = re.compile(r'^\s*import\s*[\'"]([^\'"]+)[\'"]', re.MULTILINE)
+
+class SourceFile:
+    """One file under src/, read once and shared by every check"""
+    
+    def __init__(self, path: Path, project_root: Path):
+        self.path = path
+        self.rel_path = str(path.relative_to(project_root))
+        self.name = path.name
+        self.stem = path.stem
+        self.suffix = path.suffix
+        self.content: Optional[str] = None
+        self.read_error: Optional[str] = None
+        self.imports: List[str] = []
+        self.content_hash: Optional[str] = None
+        if self.suffix in SOURCE_SUFFIXES:
+            self.load()
+    
+    def load(self):
+        """Read the file and extract its import statements"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            self.read_error = str(e)
+            return
+        self.content_hash = hashlib.sha1(self.content.encode('utf-8')).hexdigest()
+        self.imports = IMPORT_FROM_RE.findall(self.content) + SIDE_EFFECT_IMPORT_RE.findall(self.content)
+
+class SourceIndex:
+    """Every file under src/, enumerated in a single walk"""
+    
+    def __init__(self, src_dir: Path, project_root: Path):
+        self.src_dir = src_dir
+        self.project_root = project_root
+        self.files: List[SourceFile] = []
+        for dirpath, dirnames, filenames in os.walk(src_dir):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                self.files.append(SourceFile(Path(dirpath) / filename, project_root))
+        self.by_path = {f.rel_path: f for f in self.files}
+        self._importers: Optional[Dict[str, set]] = None
+    
+    def refresh(self, rel_paths: set):
+        """Re-read changed files, pick up new ones and forget deleted ones"""
+        for rel_path in rel_paths:
+            path = self.project_root / rel_path
+            if path.is_file():
+                self.by_path[rel_path] = SourceFile(path, self.project_root)
+            else:
+                # A deleted or renamed directory takes everything under it along
+                prefix = rel_path.rstrip('/') + '/'
+                for known in [p for p in self.by_path if p == rel_path or p.startswith(prefix)]:
+                    del self.by_path[known]
+                if path.is_dir():
+                    for dirpath, dirnames, filenames in os.walk(path):
+                        for filename in filenames:
+                            source = SourceFile(Path(dirpath) / filename, self.project_root)
+                            self.by_path[source.rel_path] = source
+        self.files = [self.by_path[rel_path] for rel_path in sorted(self.by_path)]
+        self._importers = None
+    
+    def resolve(self, source: SourceFile, specifier: str) -> Optional[str]:
+        """rel_path of the indexed file a relative import refers to; None for packages"""
+        if not specifier.startswith('.'):
+            return None
+        base = os.path.normpath(os.path.join(os.path.dirname(source.rel_path), specifier))
+        for suffix in RESOLVE_SUFFIXES:
+            if base + suffix in self.by_path:
+                return base + suffix
+        return None
+    
+    def importers_of(self, rel_paths: set) -> set:
+        """Files that directly import any of rel_paths"""
+        if self._importers is None:
+            importers: Dict[str, set] = {}
+            for source in self.files:
+                for specifier in source.imports:
+                    target = self.resolve(source, specifier)
+                    if target is not None:
+                        importers.setdefault(target, set()).add(source.rel_path)
+            self._importers = importers
+        found = set()
+        for rel_path in rel_paths:
+            found |= self._importers.get(rel_path, set())
+        return found
+    
+    def with_suffix(self, *suffixes: str) -> List[SourceFile]:
+        return [f for f in self.files if f.suffix in suffixes]
+    
+    def matching(self, pattern: str) -> List[SourceFile]:
+        return [f for f in self.files if fnmatch.fnmatch(f.name, pattern)]
+
+def parse_tsc_output(output: str, project_root: Path) -> List[Dict[str, Any]]:
+    """Diagnostics from non-pretty tsc output; indented lines continue the previous message"""
+    diagnostics = []
+    for line in output.split('\n'):
+        match = TSC_DIAGNOSTIC_RE.match(line.strip())
+        if match:
+            file_name, line_number, column, category, code, message = match.groups()
+            if file_name is not None and os.path.isabs(file_name):
+                file_name = os.path.relpath(file_name, project_root)
+            diagnostics.append({
+                "file": file_name,
+                "line": int(line_number) if line_number else None,
+                "column": int(column) if column else None,
+                "category": category,
+                "code": code,
+                "message": message
+            })
+        elif line.startswith(' ') and line.strip() and diagnostics:
+            diagnostics[-1]["message"] += '\n' + line.strip()
+    return diagnostics
+
+class TscWatchSession:
+    """A long-running `tsc --watch` whose latest diagnostics can be queried at any time"""
+    
+    def __init__(self, command: List[str], project_root: Path):
+        self.command = command
+        self.project_root = project_root
+        self.process: Optional[subprocess.Popen] = None
+        self.diagnostics: List[Dict[str, Any]] = []
+        self.generation = 0  # completed compilations
+        self.compiling = False
+        self._pending: List[str] = []
+        self._condition = threading.Condition()
+    
+    def start(self):
+        self.process = subprocess.Popen(
+            self.command, cwd=self.project_root, stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT, text=True, bufsize=1
+        )
+        threading.Thread(target=self._read_output, name="qc-tsc-watch", daemon=True).start()
+    
+    def _read_output(self):
+        for line in self.process.stdout:
+            with self._condition:
+                if "Starting compilation" in line or "File change detected" in line:
+                    self.compiling = True
+                    self._pending = []
+                elif TSC_WATCH_DONE_RE.search(line):
+                    self.diagnostics = parse_tsc_output(''.join(self._pending), self.project_root)
+                    self.generation += 1
+                    self.compiling = False
+                    self._condition.notify_all()
+                else:
+                    self._pending.append(line)
+        with self._condition:
+            self.compiling = False
+            self._condition.notify_all()
+    
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+    
+    def latest(self, after_generation: int = 0, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """Diagnostics of the newest compilation past after_generation, waiting while one is running"""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: not self.alive() or (self.generation > after_generation and not self.compiling),
+                timeout
+            )
+            if self.generation > after_generation:
+                return list(self.diagnostics)
+            return None
+    
+    def stop(self):
+        if self.alive():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+class ResultCache:
+    """Per-file check results persisted between runs, keyed by content hash"""
+    
+    def __init__(self, path: Path, config_files: List[Path]):
+        self.path = path
+        digest = hashlib.sha1()
+        for config_file in config_files:
+            try:
+                digest.update(config_file.read_bytes())
+            except OSError:
+                pass
+            digest.update(b"\0")
+        self.config_hash = digest.hexdigest()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self.load()
+    
+    def load(self):
+        """Load saved results unless they came from another checker version or config"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == CHECKER_VERSION and data.get("config_hash") == self.config_hash:
+            self.entries = data.get("files", {})
+    
+    def get(self, check_name: str, source: SourceFile) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self.entries.get(source.rel_path)
+            if entry is not None and entry["hash"] == source.content_hash and check_name in entry["results"]:
+                self.hits[check_name] = self.hits.get(check_name, 0) + 1
+                return entry["results"][check_name]
+            self.misses[check_name] = self.misses.get(check_name, 0) + 1
+            return None
+    
+    def put(self, check_name: str, source: SourceFile, issues: List[Dict[str, Any]]):
+        with self._lock:
+            entry = self.entries.get(source.rel_path)
+            if entry is None or entry["hash"] != source.content_hash:
+                entry = self.entries[source.rel_path] = {"hash": source.content_hash, "results": {}}
+            entry["results"][check_name] = issues
+            self.dirty = True
+    
+    def save(self, known_paths: Optional[set] = None):
+        """Write the cache atomically, dropping entries for files that no longer exist"""
+        with self._lock:
+            if known_paths is not None:
+                for rel_path in set(self.entries) - known_paths:
+                    del self.entries[rel_path]
+                    self.dirty = True
+            if not self.dirty:
+                return
+            data = {"version": CHECKER_VERSION, "config_hash": self.config_hash, "files": self.entries}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+    
+    def stats(self, check_name: Optional[str] = None) -> Dict[str, int]:
+        with self._lock:
+            if check_name is not None:
+                return {"hits": self.hits.get(check_name, 0), "misses": self.misses.get(check_name, 0)}
+            return {"hits": sum(self.hits.values()), "misses": sum(self.misses.values())}
+
 class QualityChecker:
-    def __init__(self, project_root: str):
+    # Check name -> (method, runs an external tool). Tool checks mostly wait on
+    # their subprocess, so each gets its own thread; Python scans share a pool.
+    # This order is also the order results are reported in.
+    CHECKS = {
+        "typescript": ("check_typescript_errors", True),
+        "eslint": ("check_eslint_issues", True),
+        "duplicates": ("find_duplicate_files", False),
+        "imports": ("check_import_consistency", False),
+        "central_store": ("check_central_store_usage", False),
+    }
+
+    def __init__(self, project_root: str, use_cache: bool = True, cache_dir: Optional[str] = None):
         self.project_root = Path(project_root)
         self.typescript_config = self.project_root / "tsconfig.json"
         self.package_json = self.project_root / "package.json"
         self.src_dir = self.project_root / "src"
+        self.cache_dir = Path(cache_dir) if cache_dir else self.project_root / "node_modules" / ".cache" / "quality-checker"
+        self.cache: Optional[ResultCache] = None
+        if use_cache:
+            # Compiler and lint settings can change what a file's findings are
+            self.cache = ResultCache(self.cache_dir / "results.json", [self.typescript_config, self.package_json])
+        self._index: Optional[SourceIndex] = None
+        self._index_lock = threading.Lock()
+        self.tsc_watch: Optional[TscWatchSession] = None
+        # rel_paths the file-level checks are limited to; None checks everything
+        self.scope: Optional[set] = None
+        self.changed_files: List[str] = []
+        self.scope_description: Optional[str] = None
+    
+    @property
+    def index(self) -> SourceIndex:
+        """The shared source index, built on first use by whichever check needs it"""
+        with self._index_lock:
+            if self._index is None:
+                self._index = SourceIndex(self.src_dir, self.project_root)
+            return self._index
+    
+    def reset(self):
+        """Forget the source index and reload the cache, e.g. after a config change"""
+        with self._index_lock:
+            self._index = None
+        if self.cache is not None:
+            self.cache = ResultCache(self.cache.path, [self.typescript_config, self.package_json])
+    
+    def per_file_issues(self, check_name: str, source: SourceFile, analyse) -> List[Dict[str, Any]]:
+        """A file's findings for one check, from the cache when its content is unchanged"""
+        if self.cache is None:
+            return analyse(source)
+        issues = self.cache.get(check_name, source)
+        if issues is None:
+            issues = analyse(source)
+            self.cache.put(check_name, source, issues)
+        return issues
+    
+    def git_changed_files(self, changed_since: Optional[str] = None, staged: bool = False) -> List[str]:
+        """Added, copied, modified or renamed files, relative to the project root"""
+        def git(*args: str) -> List[str]:
+            result = subprocess.run(
+                ["git", *args], cwd=self.project_root, capture_output=True, text=True, check=True
+            )
+            return [line for line in result.stdout.split('\n') if line]
         
+        if staged:
+            return git("diff", "--cached", "--name-only", "--relative", "--diff-filter=ACMR")
+        # Everything that differs from the ref in the working tree, plus new files
+        # git does not know about yet
+        changed = git("diff", "--name-only", "--relative", "--diff-filter=ACMR", changed_since, "--")
+        untracked = git("ls-files", "--others", "--exclude-standard")
+        return sorted(set(changed) | set(untracked))
+    
+    def limit_to_changes(self, changed_since: Optional[str] = None, staged: bool = False):
+        """Scope the file-level checks to changed files and the files that import them"""
+        self.changed_files = self.git_changed_files(changed_since, staged)
+        changed = {path for path in self.changed_files if path in self.index.by_path}
+        importers = self.index.importers_of(changed) - changed
+        self.scope = changed | importers
+        mode = "staged changes" if staged else f"changes since {changed_since}"
+        self.scope_description = f"{mode}: {len(changed)} changed files in src/ + {len(importers)} direct importers"
+    
+    def scoped(self, sources: List[SourceFile]) -> List[SourceFile]:
+        if self.scope is None:
+            return sources
+        return [source for source in sources if source.rel_path in self.scope]
+    
+    def lint_targets(self) -> Optional[List[str]]:
+        """Files ESLint should check in scoped mode; None means the whole project"""
+        if self.scope is None:
+            return None
+        targets = set(self.scope)
+        for path in self.changed_files:
+            if path.startswith(LINT_DIRS) and path.endswith(LINT_SUFFIXES):
+                targets.add(path)
+        return sorted(path for path in targets if path.endswith(LINT_SUFFIXES))
+    
+    def save_cache(self):
+        if self.cache is not None and self._index is not None:
+            self.cache.save(set(self._index.by_path))
+        
+    def tsc_command(self, *extra: str) -> List[str]:
+        # Build info is kept between runs so tsc only rechecks what changed
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        return self.node_bin("tsc") + [
+            "--noEmit", "--pretty", "false",
+            "--incremental", "--tsBuildInfoFile", str(self.cache_dir.resolve() / "tsconfig.tsbuildinfo"),
+            *extra,
+        ]
+    
+    def start_tsc_watch(self) -> TscWatchSession:
+        """Keep a warm `tsc --watch` running; check_typescript_errors then reads its results"""
+        if self.tsc_watch is None or not self.tsc_watch.alive():
+            self.tsc_watch = TscWatchSession(self.tsc_command("--watch", "--preserveWatchOutput"), self.project_root)
+            self.tsc_watch.start()
+        return self.tsc_watch
+    
     def check_typescript_errors(self) -> Dict[str, Any]:
         """Check for TypeScript compilation errors"""
         print("🔍 Checking TypeScript compilation...")
         
         try:
-            result = subprocess.run(
-                ["npx", "tsc", "--noEmit", "--pretty"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True
-            )
-            
-            errors = []
-            warnings = []
+            if self.tsc_watch is not None and self.tsc_watch.alive():
+                diagnostics = self.tsc_watch.latest()
+                if diagnostics is None:
+                    raise RuntimeError("tsc --watch exited before finishing a compilation")
+            else:
+                result = subprocess.run(
+                    self.tsc_command(),
+                    cwd=self.project_root,
+                    capture_output=True,
+                    text=True
+                )
+                diagnostics = parse_tsc_output(result.stdout + result.stderr, self.project_root)
+                if result.returncode != 0 and not diagnostics:
+                    raise RuntimeError((result.stderr or result.stdout).strip() or f"tsc exited with {result.returncode}")
             
-            if result.stderr or result.returncode != 0:
-                output = result.stderr + result.stdout
-                for line in output.split('\n'):
-                    if 'error TS' in line:
-                        errors.append(line.strip())
-                    elif 'warning' in line.lower():
-                        warnings.append(line.strip())
+            errors = [d for d in diagnostics if d["category"] == "error"]
+            warnings = [d for d in diagnostics if d["category"] != "error"]
             
             return {
                 "status": "pass" if len(errors) == 0 else "fail",
@@ -58,36 +615,88 @@ class QualityChecker:
                 "warnings": []
             }
     
-    def check_eslint_issues(self) -> Dict[str, Any]:
-        """Check ESLint for code quality issues"""
+    def node_bin(self, name: str) -> List[str]:
+        """Command for a project-local Node tool, skipping npx's startup when installed"""
+        local = self.project_root / "node_modules" / ".bin" / name
+        return [str(local.resolve())] if local.exists() else ["npx", name]
+    
+    def lint_files(self) -> List[str]:
+        """Every file the project's lint script would check"""
+        files = []
+        for lint_dir in LINT_DIRS:
+            for dirpath, dirnames, filenames in os.walk(self.project_root / lint_dir):
+                dirnames[:] = sorted(d for d in dirnames if d != "node_modules")
+                for filename in sorted(filenames):
+                    if filename.endswith(LINT_SUFFIXES):
+                        files.append(str((Path(dirpath) / filename).relative_to(self.project_root)))
+        return files
+    
+    def eslint_shards(self, targets: Optional[List[str]]) -> List[List[str]]:
+        """Argument lists for the ESLint runs, split across cores for large file sets"""
+        if targets is None:
+            files = self.lint_files()
+            if len(files) < ESLINT_SHARD_MIN_FILES:
+                # Let ESLint walk the directories itself, honouring its ignore files
+                return [[d for d in LINT_DIRS if (self.project_root / d).is_dir()]]
+            targets = files
+        shard_count = min(os.cpu_count() or 1, max(1, len(targets) // (ESLINT_SHARD_MIN_FILES // 2)))
+        shards: List[List[str]] = [[] for _ in range(shard_count)]
+        for path in targets:
+            # Assigned by path hash so a file stays in the same shard, and so keeps
+            # hitting the same ESLint cache, as files come and go
+            shards[zlib.crc32(path.encode()) % shard_count].append(path)
+        return [shard for shard in shards if shard]
+    
+    def _run_eslint(self, shard_index: int, paths: List[str]) -> List[Dict[str, Any]]:
+        # Each shard keeps its own cache file; concurrent ESLint runs would
+        # otherwise overwrite each other's
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        command = self.node_bin("eslint") + [
+            "--format", "json",
+            "--cache", "--cache-strategy", "content",
+            "--cache-location", str(self.cache_dir.resolve() / f"eslintcache-{shard_index}"),
+            "--ext", ",".join(LINT_SUFFIXES),
+            *paths,
+        ]
+        result = subprocess.run(command, cwd=self.project_root, capture_output=True, text=True)
+        # Exit status 1 only means lint errors were found; 2 is a crash or bad config
+        if result.returncode not in (0, 1):
+            raise RuntimeError((result.stderr or result.stdout).strip() or f"eslint exited with {result.returncode}")
+        return json.loads(result.stdout or "[]")
+    
+    def check_eslint_issues(self, files: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Check ESLint for code quality issues, in the given files if any"""
         print("🔍 Checking ESLint issues...")
         
+        targets = files if files is not None else self.lint_targets()
+        if targets is not None and not targets:
+            return {"status": "pass", "issues": [], "error_count": 0, "warning_count": 0, "skipped": "no changed files to lint"}
+        
         try:
-            result = subprocess.run(
-                ["npm", "run", "lint"],
-                cwd=self.project_root,
-                capture_output=True,
-                text=True
-            )
+            shards = self.eslint_shards(targets)
+            with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="qc-eslint") as pool:
+                reports = list(pool.map(self._run_eslint, range(len(shards)), shards))
             
             issues = []
-            error_count = 0
-            warning_count = 0
+            for file_result in sorted((r for report in reports for r in report), key=lambda r: r["filePath"]):
+                file_path = os.path.relpath(file_result["filePath"], self.project_root)
+                for message in file_result["messages"]:
+                    rule = message.get("ruleId")
+                    if rule is None and message.get("message", "").startswith("File ignored"):
+                        # Explicitly passed files matching an ignore pattern
+                        continue
+                    issues.append({
+                        "type": "error" if message.get("severity") == 2 else "warning",
+                        "file": file_path,
+                        "line": message.get("line"),
+                        "column": message.get("column"),
+                        "rule": rule,
+                        "message": message.get("message", "")
+                    })
             
-            for line in result.stdout.split('\n'):
-                if 'error' in line and '✖' not in line:
-                    error_count += 1
-                    issues.append({"type": "error", "message": line.strip()})
-                elif 'warning' in line:
-                    warning_count += 1
-                    issues.append({"type": "warning", "message": line.strip()})
-            
-            return {
-                "status": "pass" if error_count == 0 else "fail",
-                "issues": issues,
-                "error_count": error_count,
-                "warning_count": warning_count
-            }
+            result = self.eslint_result(issues)
+            result["shards"] = len(shards)
+            return result
         except Exception as e:
             return {
                 "status": "error", 
@@ -95,6 +704,22 @@ class QualityChecker:
                 "issues": []
             }
     
+    @staticmethod
+    def eslint_result(issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Exact error/warning and per-rule counts for a list of ESLint records"""
+        rule_counts: Dict[str, int] = {}
+        for issue in issues:
+            rule_key = issue["rule"] or "fatal"
+            rule_counts[rule_key] = rule_counts.get(rule_key, 0) + 1
+        error_count = sum(1 for issue in issues if issue["type"] == "error")
+        return {
+            "status": "pass" if error_count == 0 else "fail",
+            "issues": issues,
+            "error_count": error_count,
+            "warning_count": len(issues) - error_count,
+            "rule_counts": dict(sorted(rule_counts.items(), key=lambda item: (-item[1], item[0])))
+        }
+    
     def find_duplicate_files(self) -> Dict[str, Any]:
         """Find duplicate or backup files that shouldn't exist"""
         print("🔍 Checking for duplicate/backup files...")
@@ -102,27 +727,30 @@ class QualityChecker:
         issues = []
         
         # Look for backup files
-        backup_patterns = ["*.backup", "*.bak", "*_backup.*"]
-        for pattern in backup_patterns:
-            for file_path in self.src_dir.rglob(pattern):
+        for pattern in BACKUP_PATTERNS:
+            for source in self.scoped(self.index.matching(pattern)):
                 issues.append({
                     "type": "duplicate_file",
-                    "path": str(file_path.relative_to(self.project_root)),
-                    "description": f"Backup file found: {file_path.name}"
+                    "path": source.rel_path,
+                    "description": f"Backup file found: {source.name}"
                 })
         
-        # Look for duplicate component names
+        # Look for duplicate component names; every file takes part in the
+        # comparison, but in scoped mode only clashes involving a changed file count
         component_files = {}
-        for tsx_file in self.src_dir.rglob("*.tsx"):
-            component_name = tsx_file.stem
+        for source in self.index.with_suffix(".tsx"):
+            component_name = source.stem
             if component_name in component_files:
+                if self.scope is not None and source.rel_path not in self.scope \
+                        and component_files[component_name] not in self.scope:
+                    continue
                 issues.append({
                     "type": "duplicate_component",
-                    "path": str(tsx_file.relative_to(self.project_root)),
+                    "path": source.rel_path,
                     "description": f"Duplicate component name: {component_name}"
                 })
             else:
-                component_files[component_name] = str(tsx_file.relative_to(self.project_root))
+                component_files[component_name] = source.rel_path
         
         return {
             "status": "pass" if len(issues) == 0 else "warn",
@@ -137,41 +765,49 @@ class QualityChecker:
         issues = []
         import_patterns = {}
         
-        for tsx_file in self.src_dir.rglob("*.tsx"):
-            try:
-                with open(tsx_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    
-                # Check for unused imports (basic check)
-                import_lines = [line for line in content.split('\n') if line.strip().startswith('import')]
-                for import_line in import_lines:
-                    # Extract imported names
-                    match = re.search(r'import\s+\{([^}]+)\}', import_line)
-                    if match:
-                        imports = [imp.strip() for imp in match.group(1).split(',')]
-                        for imp in imports:
-                            # Check if import is used in file
-                            if f'<{imp}' not in content and f'use{imp}' not in content and imp not in content.split('<')[1].split('>')[0] if '<' in content else []:
-                                issues.append({
-                                    "type": "unused_import",
-                                    "file": str(tsx_file.relative_to(self.project_root)),
-                                    "import": imp,
-                                    "line": import_line.strip()
-                                })
-                                
-            except Exception as e:
+        for source in self.scoped(self.index.with_suffix(".tsx")):
+            if source.read_error is not None:
                 issues.append({
                     "type": "read_error",
-                    "file": str(tsx_file.relative_to(self.project_root)),
-                    "error": str(e)
+                    "file": source.rel_path,
+                    "error": source.read_error
                 })
+                continue
+            issues.extend(self.per_file_issues("imports", source, self._unused_imports))
         
         return {
             "status": "pass" if len(issues) == 0 else "warn",
             "issues": issues,
-            "issue_count": len(issues)
+            "issue_count": len(issues),
+            **self._cache_stats("imports")
         }
     
+    def _unused_imports(self, source: SourceFile) -> List[Dict[str, Any]]:
+        issues = []
+        content = source.content
+        bindings, used = identifier_index(content)
+        for binding in bindings:
+            if binding.local in used:
+                continue
+            if binding.local == "React" and source.suffix == ".tsx":
+                # In scope for JSX under the classic runtime; harmless under react-jsx
+                continue
+            line_start = content.rfind('\n', 0, binding.offset) + 1
+            line_end = content.find('\n', binding.offset)
+            issues.append({
+                "type": "unused_import",
+                "file": source.rel_path,
+                "import": binding.local,
+                "kind": binding.kind,
+                "type_only": binding.type_only,
+                "line_number": content.count('\n', 0, binding.offset) + 1,
+                "line": content[line_start:line_end if line_end != -1 else None].strip()
+            })
+        return issues
+    
+    def _cache_stats(self, check_name: str) -> Dict[str, Any]:
+        return {"cache": self.cache.stats(check_name)} if self.cache is not None else {}
+    
     def check_central_store_usage(self) -> Dict[str, Any]:
         """Verify proper usage of central store and data patterns"""
         print("🔍 Checking central store usage patterns...")
@@ -188,46 +824,76 @@ class QualityChecker:
             return {"status": "fail", "issues": issues}
         
         # Check if components are using central store properly
-        for tsx_file in self.src_dir.rglob("*.tsx"):
-            try:
-                with open(tsx_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Check for direct state management instead of central store
-                if 'useState(' in content and 'useCentralStore' not in content:
-                    if 'Page' in str(tsx_file) or any(page in str(tsx_file) for page in ['CRM', 'ProjectManagement', 'Invoicing']):
-                        issues.append({
-                            "type": "incorrect_state_usage",
-                            "file": str(tsx_file.relative_to(self.project_root)),
-                            "description": "Page component using useState instead of central store"
-                        })
-                        
-            except Exception:
+        for source in self.scoped(self.index.with_suffix(".tsx")):
+            if source.content is None:
                 continue
+            issues.extend(self.per_file_issues("central_store", source, self._central_store_misuse))
         
         return {
             "status": "pass" if len(issues) == 0 else "warn",
             "issues": issues,
-            "issue_count": len(issues)
+            "issue_count": len(issues),
+            **self._cache_stats("central_store")
         }
     
-    def run_full_check(self) -> Dict[str, Any]:
-        """Run all quality checks"""
+    def _central_store_misuse(self, source: SourceFile) -> List[Dict[str, Any]]:
+        content = source.content
+        # Check for direct state management instead of central store
+        if 'useState(' in content and 'useCentralStore' not in content:
+            if 'Page' in str(source.path) or any(page in str(source.path) for page in ['CRM', 'ProjectManagement', 'Invoicing']):
+                return [{
+                    "type": "incorrect_state_usage",
+                    "file": source.rel_path,
+                    "description": "Page component using useState instead of central store"
+                }]
+        return []
+    
+    def run_check(self, check_name: str, **options) -> Dict[str, Any]:
+        """Run one check by name, recording its wall time"""
+        method_name, _ = self.CHECKS[check_name]
+        started = time.perf_counter()
+        try:
+            result = getattr(self, method_name)(**options)
+        except Exception as e:
+            result = {"status": "error", "error": str(e), "issues": []}
+        result["duration_seconds"] = round(time.perf_counter() - started, 3)
+        return result
+    
+    @staticmethod
+    def summarize(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Totals across check results; any error fails the run"""
+        total_errors = sum(r.get("error_count", 0) for r in results.values())
+        return {
+            "overall_status": "pass" if total_errors == 0 else "fail",
+            "total_errors": total_errors,
+            "total_warnings": sum(r.get("warning_count", 0) for r in results.values()),
+            "total_issues": sum(r.get("issue_count", 0) for r in results.values())
+        }
+    
+    def run_full_check(self, jobs: Optional[int] = None) -> Dict[str, Any]:
+        """Run all quality checks concurrently"""
         print("🚀 Running full quality check...")
+        if self.scope_description:
+            print(f"🎯 Scoped to {self.scope_description}")
         print("=" * 50)
         
-        results = {
-            "typescript": self.check_typescript_errors(),
-            "eslint": self.check_eslint_issues(),
-            "duplicates": self.find_duplicate_files(),
-            "imports": self.check_import_consistency(),
-            "central_store": self.check_central_store_usage()
-        }
+        started = time.perf_counter()
+        tool_checks = [name for name, (_, external) in self.CHECKS.items() if external]
+        scan_checks = [name for name, (_, external) in self.CHECKS.items() if not external]
+        scan_workers = jobs or min(len(scan_checks), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=len(tool_checks), thread_name_prefix="qc-tool") as tools, \
+                ThreadPoolExecutor(max_workers=scan_workers, thread_name_prefix="qc-scan") as scans:
+            futures = {name: tools.submit(self.run_check, name) for name in tool_checks}
+            futures.update({name: scans.submit(self.run_check, name) for name in scan_checks})
+            # Collected in CHECKS order, whatever order they finish in
+            results = {name: futures[name].result() for name in self.CHECKS}
+        wall_time = round(time.perf_counter() - started, 3)
+        self.save_cache()
         
-        # Summary
-        total_errors = sum(r.get("error_count", 0) for r in results.values())
-        total_warnings = sum(r.get("warning_count", 0) for r in results.values())
-        total_issues = sum(r.get("issue_count", 0) for r in results.values())
+        summary = self.summarize(results)
+        total_errors = summary["total_errors"]
+        total_warnings = summary["total_warnings"]
+        total_issues = summary["total_issues"]
         
         print("\n" + "=" * 50)
         print("📊 QUALITY CHECK SUMMARY")
@@ -235,7 +901,7 @@ class QualityChecker:
         
         for check_name, result in results.items():
             status_emoji = "✅" if result["status"] == "pass" else "⚠️" if result["status"] == "warn" else "❌"
-            print(f"{status_emoji} {check_name.upper()}: {result['status'].upper()}")
+            print(f"{status_emoji} {check_name.upper()}: {result['status'].upper()} ({result['duration_seconds']:.1f}s)")
             
             if result.get("error_count", 0) > 0:
                 print(f"   Errors: {result['error_count']}")
@@ -245,8 +911,12 @@ class QualityChecker:
                 print(f"   Issues: {result['issue_count']}")
         
         print(f"\n📈 TOTAL: {total_errors} errors, {total_warnings} warnings, {total_issues} issues")
+        if self.cache is not None:
+            cache_stats = self.cache.stats()
+            print(f"💾 Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+        print(f"⏱️  Wall time: {wall_time:.1f}s (checks took {sum(r['duration_seconds'] for r in results.values()):.1f}s combined)")
         
-        overall_status = "pass" if total_errors == 0 else "fail"
+        overall_status = summary["overall_status"]
         print(f"\n🎯 OVERALL STATUS: {overall_status.upper()}")
         
         return {
@@ -255,32 +925,309 @@ class QualityChecker:
             "summary": {
                 "total_errors": total_errors,
                 "total_warnings": total_warnings,
-                "total_issues": total_issues
+                "total_issues": total_issues,
+                "wall_time_seconds": wall_time,
+                "cache": self.cache.stats() if self.cache is not None else None,
+                "scope": self.scope_description
             }
         }
 
+CONFIG_FILES = ("tsconfig.json", "package.json")
+
+class InotifyWatcher:
+    """Changes under src/ and to the config files, from Linux inotify via ctypes"""
+    
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+    
+    def __init__(self, project_root: Path, src_dir: Path):
+        self.project_root = project_root
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches: Dict[int, Path] = {}
+        # Editors often save by renaming over the file, which would drop a watch
+        # on the file itself, so config files are watched through their directory
+        self.add(project_root)
+        self.add_tree(src_dir)
+    
+    def add(self, directory: Path):
+        wd = self._add_watch(self.fd, os.fsencode(str(directory)), self.MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOENT:
+                return
+            raise OSError(error, f"inotify_add_watch failed for {directory}: {os.strerror(error)}")
+        self.watches[wd] = directory
+    
+    def add_tree(self, directory: Path):
+        for dirpath, _, _ in os.walk(directory):
+            self.add(Path(dirpath))
+    
+    def read_changes(self, timeout: float) -> Optional[Set[str]]:
+        """Changed paths relative to the project root; None if events were lost"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b"\0"))
+            offset += self.EVENT.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if mask & self.IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / name
+            if directory == self.project_root and name not in CONFIG_FILES:
+                continue
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                self.add_tree(path)
+            changed.add(str(path.relative_to(self.project_root)))
+        return changed
+    
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback for platforms without inotify: compares mtimes every interval"""
+    
+    def __init__(self, project_root: Path, src_dir: Path, interval: float = 1.0):
+        self.project_root = project_root
+        self.src_dir = src_dir
+        self.interval = interval
+        self.state = self.snapshot()
+    
+    def snapshot(self) -> Dict[str, tuple]:
+        state = {}
+        paths = [self.project_root / name for name in CONFIG_FILES]
+        for dirpath, _, filenames in os.walk(self.src_dir):
+            paths.extend(Path(dirpath) / filename for filename in filenames)
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            state[str(path.relative_to(self.project_root))] = (stat.st_mtime_ns, stat.st_size)
+        return state
+    
+    def read_changes(self, timeout: float) -> Optional[Set[str]]:
+        time.sleep(min(timeout, self.interval))
+        current = self.snapshot()
+        changed = {path for path in current.keys() | self.state.keys() if current.get(path) != self.state.get(path)}
+        self.state = current
+        return changed
+    
+    def close(self):
+        pass
+
+class QualityWatcher:
+    """Re-runs the checks affected by each batch of file changes and publishes the results"""
+    
+    # tsc --watch may ignore a change (e.g. an excluded file); don't wait forever for it
+    TSC_WAIT_SECONDS = 60.0
+    
+    def __init__(self, checker: QualityChecker, output: Path, debounce: float = 0.3, poll: bool = False):
+        self.checker = checker
+        self.output = output
+        self.debounce = debounce
+        self.watcher = None
+        if not poll:
+            try:
+                self.watcher = InotifyWatcher(checker.project_root, checker.src_dir)
+            except (OSError, AttributeError) as e:
+                print(f"⚠️  inotify unavailable ({e}), polling for changes instead")
+        if self.watcher is None:
+            self.watcher = PollingWatcher(checker.project_root, checker.src_dir)
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.eslint_issues: Dict[str, List[Dict[str, Any]]] = {}  # file -> ESLint records
+        self.running: Set[str] = set()
+        self.generation = 0
+        self.tsc_generation = 0
+        self.last_changes: List[str] = []
+        self._lock = threading.Lock()
+    
+    def _terminate(self, signum, frame):
+        raise KeyboardInterrupt
+    
+    def run(self):
+        # Stop the same way on SIGTERM as on Ctrl+C, so tsc --watch is not orphaned
+        signal.signal(signal.SIGTERM, self._terminate)
+        self.checker.start_tsc_watch()
+        print(f"👀 Watching {self.checker.src_dir} - results in {self.output}")
+        self.run_checks(set(self.checker.CHECKS))
+        pending: Set[str] = set()
+        rescan = False
+        try:
+            while True:
+                changes = self.watcher.read_changes(self.debounce if pending or rescan else 1.0)
+                if changes is None:
+                    rescan = True
+                elif changes:
+                    pending |= changes
+                elif pending or rescan:
+                    # Quiet for a whole debounce interval: handle the batch
+                    self.handle_changes(pending, rescan)
+                    pending = set()
+                    rescan = False
+        except KeyboardInterrupt:
+            print("\n👋 Stopping watch mode")
+        finally:
+            self.watcher.close()
+            if self.checker.tsc_watch is not None:
+                self.checker.tsc_watch.stop()
+    
+    def handle_changes(self, changed: Set[str], rescan: bool = False):
+        self.last_changes = sorted(changed)
+        if rescan or any(path in CONFIG_FILES for path in changed):
+            # New compiler or lint settings can change any finding
+            print("🔄 Configuration changed: re-running every check")
+            self.checker.reset()
+            self.eslint_issues = {}
+            self.run_checks(set(self.checker.CHECKS))
+            return
+        
+        self.checker.index.refresh({path for path in changed if path.startswith("src/")})
+        sources = {path for path in changed if path.endswith(tuple(SOURCE_SUFFIXES))}
+        checks = {"duplicates"}
+        if any(path.endswith(".tsx") for path in changed):
+            checks |= {"imports", "central_store"}
+        if sources:
+            checks.add("typescript")
+        lint_files = None
+        if any(path.endswith(LINT_SUFFIXES) for path in changed):
+            # Changed files plus their importers, whose lint results can depend on them
+            existing = {path for path in changed if (self.checker.project_root / path).is_file()}
+            lint_files = sorted(path for path in existing | self.checker.index.importers_of(existing)
+                                if path.endswith(LINT_SUFFIXES))
+            for path in changed:
+                self.eslint_issues.pop(path, None)
+            checks.add("eslint")
+        print(f"🔄 {len(changed)} changed: re-running {', '.join(name for name in self.checker.CHECKS if name in checks)}")
+        self.run_checks(checks, lint_files)
+    
+    def run_checks(self, checks: Set[str], lint_files: Optional[List[str]] = None):
+        with self._lock:
+            self.generation += 1
+            self.running = set(checks)
+        self.publish()
+        with ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="qc-watch") as pool:
+            futures = {pool.submit(self.run_one, name, lint_files): name for name in checks}
+            # Published as each finishes, so fast checks aren't held up by tsc
+            for future in as_completed(futures):
+                name = futures[future]
+                result = future.result()
+                with self._lock:
+                    self.results[name] = result
+                    self.running.discard(name)
+                status_emoji = "✅" if result["status"] == "pass" else "⚠️" if result["status"] == "warn" else "❌"
+                print(f"{status_emoji} {name.upper()}: {result['status'].upper()} ({result['duration_seconds']:.1f}s)")
+                self.publish()
+        self.checker.save_cache()
+    
+    def run_one(self, name: str, lint_files: Optional[List[str]]) -> Dict[str, Any]:
+        if name == "eslint":
+            result = self.checker.run_check("eslint", files=lint_files)
+            if result["status"] == "error":
+                return result
+            linted = set(lint_files) if lint_files is not None else None
+            if linted is None:
+                self.eslint_issues = {}
+            else:
+                for path in linted:
+                    self.eslint_issues.pop(path, None)
+            for issue in result["issues"]:
+                self.eslint_issues.setdefault(issue["file"], []).append(issue)
+            merged = self.checker.eslint_result([issue for path in sorted(self.eslint_issues) for issue in self.eslint_issues[path]])
+            merged["duration_seconds"] = result["duration_seconds"]
+            return merged
+        if name == "typescript" and self.checker.tsc_watch is not None and self.checker.tsc_watch.alive():
+            # Wait for the compilation this change triggers in the warm tsc --watch
+            session = self.checker.tsc_watch
+            started = time.perf_counter()
+            if session.latest(self.tsc_generation, timeout=self.TSC_WAIT_SECONDS) is not None:
+                self.tsc_generation = session.generation
+            result = self.checker.run_check("typescript")
+            result["duration_seconds"] = round(time.perf_counter() - started, 3)
+            return result
+        return self.checker.run_check(name)
+    
+    def publish(self):
+        """Write the latest results atomically, for editors and scripts to poll"""
+        with self._lock:
+            results = {name: self.results[name] for name in self.checker.CHECKS if name in self.results}
+            state = {
+                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "generation": self.generation,
+                "running": [name for name in self.checker.CHECKS if name in self.running],
+                "last_changes": self.last_changes,
+                **self.checker.summarize(results),
+                "results": results
+            }
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.output.with_name(f"{self.output.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.output)
+
 def main():
     parser = argparse.ArgumentParser(description="Quality checker for Florida First Roofing project")
     parser.add_argument("--type", choices=["typescript", "eslint", "duplicates", "imports", "central_store", "all"], 
                        default="all", help="Type of check to run")
     parser.add_argument("--project-root", default=".", help="Project root directory")
     parser.add_argument("--output", help="Output results to JSON file")
+    parser.add_argument("--no-cache", action="store_true", help="Analyse every file instead of reusing cached results")
+    parser.add_argument("--cache-dir", help="Where cached results are kept (default: node_modules/.cache/quality-checker)")
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument("--changed-since", metavar="REF", help="Only check files changed since this git ref, plus the files that import them")
+    scope.add_argument("--staged", action="store_true", help="Only check staged files, plus the files that import them")
+    parser.add_argument("--watch", action="store_true", help="Keep running, re-checking whatever each batch of file changes affects")
+    parser.add_argument("--watch-output", help="JSON file watch mode keeps the latest results in (default: <cache dir>/watch-results.json)")
+    parser.add_argument("--debounce", type=float, default=0.3, help="Seconds of quiet before a batch of changes is checked in watch mode")
+    parser.add_argument("--poll", action="store_true", help="Poll for changes in watch mode instead of using inotify")
+    parser.add_argument("--jobs", type=int, help="Worker threads for the file-scanning checks (default: one per check, up to the CPU count)")
     
     args = parser.parse_args()
+    if args.watch and (args.changed_since or args.staged or args.type != "all"):
+        parser.error("--watch runs every check over the whole tree; it cannot be combined with --type, --changed-since or --staged")
     
-    checker = QualityChecker(args.project_root)
+    checker = QualityChecker(args.project_root, use_cache=not args.no_cache, cache_dir=args.cache_dir)
+    if args.watch:
+        output = Path(args.watch_output) if args.watch_output else checker.cache_dir / "watch-results.json"
+        QualityWatcher(checker, output, debounce=args.debounce, poll=args.poll).run()
+        return
+    if args.changed_since or args.staged:
+        try:
+            checker.limit_to_changes(args.changed_since, args.staged)
+        except (OSError, subprocess.CalledProcessError) as e:
+            parser.error(f"could not list changed files from git: {getattr(e, 'stderr', '') or e}")
     
     if args.type == "all":
-        results = checker.run_full_check()
+        results = checker.run_full_check(jobs=args.jobs)
     else:
-        method_map = {
-            "typescript": checker.check_typescript_errors,
-            "eslint": checker.check_eslint_issues,
-            "duplicates": checker.find_duplicate_files,
-            "imports": checker.check_import_consistency,
-            "central_store": checker.check_central_store_usage
-        }
-        results = method_map[args.type]()
+        results = checker.run_check(args.type)
+        checker.save_cache()
         print(json.dumps(results, indent=2))
     
     if args.output:
@@ -1,50 +1,2984 @@
 #!/usr/bin/env python3
+import argparse
+import bisect
+import email.utils
+import http.client
 import http.server
-import socketserver
-import urllib.request
+import io
+import ipaddress
+import json
+import math
+import mimetypes
+import os
+import posixpath
+import queue
+import select
+import selectors
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
 import urllib.parse
-from urllib.error import URLError
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # br is offered only when the optional brotli package is installed
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; log rotation is then per process
+    fcntl = None
+
+# Upstream bodies are relayed in pieces of at most this many bytes
+CHUNK_SIZE = 64 * 1024
+
+# Connection-scoped headers that must not be forwarded by a proxy (RFC 7230 6.1)
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'transfer-encoding', 'upgrade',
+}
+
+DEFAULT_UPSTREAM = "http://localhost:3000"
+
+# Paths served by the Express backend when backend upstreams are configured
+DEFAULT_API_PREFIXES = ['/api', '/health']
+
+BALANCE_STRATEGIES = ['round-robin', 'least-outstanding']
+
+class NoHealthyUpstream(Exception):
+    """Every upstream in a group has its circuit open."""
+
+class CircuitBreaker:
+    """Stops traffic to an upstream after repeated failures.
+
+    closed: requests flow and consecutive failures are counted.
+    open: requests fail fast until ``reset_timeout`` has passed.
+    half_open: a single trial request is let through; its outcome (or a
+    successful health probe) closes the circuit again or re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, reset_timeout=10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record(self, success):
+        """Record a request outcome; None means it said nothing about the upstream."""
+        with self._lock:
+            self._trial_in_flight = False
+            if success is None:
+                return
+            if success:
+                self.state = self.CLOSED
+                self.failures = 0
+            elif self.state == self.HALF_OPEN:
+                self._open()
+            else:
+                self.failures += 1
+                if self.state == self.CLOSED and self.failures >= self.failure_threshold:
+                    self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "times_opened": self.times_opened,
+            }
+
+# Errors on a reused keep-alive connection that mean the upstream closed it
+# while it sat idle; the request is retried once on a fresh connection
+STALE_CONNECTION_ERRORS = (ConnectionError, http.client.BadStatusLine)
+
+# Request headers that are not forwarded as-is; the body framing is redone by
+# the proxy and 100-continue is answered by http.server itself
+REQUEST_SKIP_HEADERS = HOP_BY_HOP_HEADERS | {'host', 'content-length', 'expect'}
+
+# Headers the proxy sets itself when answering from the cache
+CACHE_SKIP_HEADERS = HOP_BY_HOP_HEADERS | {'server', 'date', 'age', 'content-length'}
+
+# Headers a 304 Not Modified carries over from the full response (RFC 7232 4.1)
+NOT_MODIFIED_HEADERS = {'cache-control', 'content-location', 'etag', 'expires', 'last-modified', 'vary'}
+
+# Request preconditions (RFC 7232); when the proxy revalidates a cache entry
+# only its own are sent, so a 304 always speaks about the stored copy
+CONDITIONAL_HEADERS = {'if-match', 'if-none-match', 'if-modified-since', 'if-unmodified-since', 'if-range'}
+
+# Request headers that can change an upstream response, so concurrent GETs are
+# only coalesced when they agree on all of them
+COALESCE_KEY_HEADERS = ('Accept', 'Accept-Encoding', 'Accept-Language', 'Cookie')
+
+# Requests carrying these ask for part of a body or for a response that
+# depends on the client's copy, so they are never coalesced
+COALESCE_EXCLUDED_HEADERS = ('Range', 'If-Range', 'If-Match', 'If-Unmodified-Since')
+
+# Content types worth compressing; images, fonts and archives already are
+COMPRESSIBLE_TYPES = {
+    'application/javascript', 'application/json', 'application/manifest+json',
+    'application/xml', 'application/x-javascript', 'image/svg+xml', 'image/x-icon',
+}
+
+# Streamed responses favour speed; stored variants are compressed once, so
+# they can afford the slower, smaller settings
+BROTLI_STREAM_QUALITY = 4
+BROTLI_STORED_QUALITY = 9
+GZIP_STORED_LEVEL = 9
+
+# Precompressed siblings looked for next to static files, in preference order
+PRECOMPRESSED_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# Static files without such siblings are compressed on first request and the
+# result kept until the file changes; larger files are sent as they are
+STATIC_COMPRESS_MAX_BYTES = 8 * 1024 * 1024
+
+# Create React App fingerprints everything under build/static/, so those
+# files can be cached forever; anything else must be revalidated
+IMMUTABLE_STATIC_PREFIX = '/static/'
+
+class RequestBodyError(Exception):
+    """The client sent a request body whose framing could not be parsed."""
+
+class RequestBodyTimeout(RequestBodyError):
+    """The client stopped sending its request body for longer than the read timeout."""
+
+# Sent straight onto the socket of a connection refused because every worker
+# slot and queue place is taken; no handler or request parsing is involved
+SATURATED_RETRY_AFTER = 1
+SATURATED_RESPONSE = (
+    "HTTP/1.1 503 Service Unavailable\r\n"
+    f"Retry-After: {SATURATED_RETRY_AFTER}\r\n"
+    "Content-Length: 0\r\n"
+    "Connection: close\r\n\r\n"
+).encode('ascii')
+
+class ConnectionPool:
+    """Persistent HTTP/1.1 connections to one upstream, shared by all workers."""
+
+    def __init__(self, url, max_size=16, idle_timeout=4.0, connect_timeout=5.0, read_timeout=60.0):
+        parsed = urllib.parse.urlsplit(url)
+        self.url = url
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._idle = []  # (connection, released_at), oldest first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reconnects = 0
+
+    def acquire(self):
+        """Return (connection, reused) - the most recently used idle connection if any."""
+        expired = []
+        conn = None
+        with self._lock:
+            expired = self._evict_expired(time.monotonic())
+            while self._idle:
+                candidate, _ = self._idle.pop()
+                if self._is_stale(candidate):
+                    self.evictions += 1
+                    expired.append(candidate)
+                    continue
+                conn = candidate
+                self.hits += 1
+                break
+            else:
+                self.misses += 1
+        for stale in expired:
+            stale.close()
+        if conn is not None:
+            return conn, True
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.connect_timeout), False
+
+    def connect(self, conn):
+        """Open a new connection, then switch it from the connect to the read timeout."""
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+
+    def release(self, conn):
+        with self._lock:
+            expired = self._evict_expired(time.monotonic())
+            if len(self._idle) < self.max_size:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+        for stale in expired:
+            stale.close()
+        if conn is not None:
+            conn.close()
+
+    def discard(self, conn, reconnect=False):
+        conn.close()
+        if reconnect:
+            with self._lock:
+                self.reconnects += 1
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "upstream": self.url,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "reconnects": self.reconnects,
+            }
+
+    def _evict_expired(self, now):
+        # Called with the lock held; the oldest connections sit at the front
+        expired = []
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            expired.append(self._idle.pop(0)[0])
+            self.evictions += 1
+        return expired
+
+    @staticmethod
+    def _is_stale(conn):
+        # An idle connection should have nothing to read; readable means the
+        # upstream sent EOF (or garbage) and the socket is no longer usable
+        if conn.sock is None:
+            return True
+        try:
+            readable, _, _ = select.select([conn.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+class Upstream:
+    """One upstream server with its connection pool and in-flight request count."""
+
+    def __init__(self, url, pool_size=16, idle_timeout=4.0, breaker=None,
+                 connect_timeout=5.0, read_timeout=60.0):
+        self.url = url
+        self.pool = ConnectionPool(url, max_size=pool_size, idle_timeout=idle_timeout,
+                                   connect_timeout=connect_timeout, read_timeout=read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.outstanding = 0
+
+    def stats(self):
+        stats = self.pool.stats()
+        stats["outstanding"] = self.outstanding
+        stats["circuit"] = self.breaker.stats()
+        return stats
+
+class UpstreamGroup:
+    """Interchangeable upstreams that requests are balanced across."""
+
+    def __init__(self, name, upstreams, balance='round-robin', health_path=None):
+        if not upstreams:
+            raise ValueError(f"upstream group {name!r} has no upstreams")
+        if balance not in BALANCE_STRATEGIES:
+            raise ValueError(f"unknown balance strategy {balance!r}")
+        self.name = name
+        self.upstreams = upstreams
+        self.balance = balance
+        self.health_path = health_path
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            # Rotate the starting point every call so round-robin walks the
+            # list and least-outstanding spreads ties instead of favouring one
+            start = self._cursor
+            self._cursor = (start + 1) % len(self.upstreams)
+            candidates = self.upstreams[start:] + self.upstreams[:start]
+            if self.balance == 'least-outstanding':
+                candidates.sort(key=lambda candidate: candidate.outstanding)
+            for upstream in candidates:
+                if upstream.breaker.allow_request():
+                    upstream.outstanding += 1
+                    return upstream
+        raise NoHealthyUpstream(f"no healthy upstream for {self.name}")
+
+    def release(self, upstream):
+        with self._lock:
+            upstream.outstanding -= 1
+
+    def close(self):
+        for upstream in self.upstreams:
+            upstream.pool.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "balance": self.balance,
+                "upstreams": [upstream.stats() for upstream in self.upstreams],
+            }
+
+class Router:
+    """Maps request paths to upstream groups by prefix, first match wins."""
+
+    def __init__(self, routes, default):
+        self.routes = [(prefix.rstrip('/'), group) for prefix, group in routes]
+        self.default = default
+
+    def match(self, path):
+        return self.route(path)[1]
+
+    def route(self, path):
+        """(prefix, group) for path; the default route's prefix is '/'."""
+        path = path.split('?', 1)[0]
+        for prefix, group in self.routes:
+            if path == prefix or path.startswith(prefix + '/'):
+                return prefix, group
+        return '/', self.default
+
+    def groups(self):
+        groups = {self.default.name: self.default}
+        for _, group in self.routes:
+            groups.setdefault(group.name, group)
+        return groups
+
+    def close(self):
+        for group in self.groups().values():
+            group.close()
+
+    def stats(self):
+        return {name: group.stats() for name, group in self.groups().items()}
+
+class HealthChecker(threading.Thread):
+    """Probes every upstream's health endpoint in the background.
+
+    Probe results feed the same circuit breakers as live traffic, so a hung
+    worker is taken out of rotation without requests having to time out on
+    it first, and a recovered one is restored without waiting for a trial.
+    """
+
+    def __init__(self, router, interval=5.0, timeout=2.0):
+        super().__init__(name="proxy-health", daemon=True)
+        self.router = router
+        self.interval = interval
+        self.timeout = timeout
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            for group in self.router.groups().values():
+                if group.health_path is None:
+                    continue
+                for upstream in group.upstreams:
+                    upstream.breaker.record(self.probe(upstream, group.health_path))
+            self._stopped.wait(self.interval)
+
+    def probe(self, upstream, path):
+        conn = http.client.HTTPConnection(upstream.pool.host, upstream.pool.port, timeout=self.timeout)
+        try:
+            conn.request('GET', path, headers={'User-Agent': 'proxy-health-check'})
+            response = conn.getresponse()
+            response.read()
+            return response.status < 500
+        except (OSError, http.client.HTTPException):
+            return False
+        finally:
+            conn.close()
+
+    def stop(self):
+        self._stopped.set()
+
+def parse_cache_control(value):
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else True
+    return directives
+
+def parse_http_date(value):
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def etag_matches(header, etag):
+    # If-None-Match uses the weak comparison function (RFC 7232 2.3.2)
+    if header.strip() == '*':
+        return True
+    strip_weak = lambda tag: tag.strip().removeprefix('W/')
+    return strip_weak(etag) in {strip_weak(tag) for tag in header.split(',')}
+
+class CacheEntry:
+    """A stored 200 response plus what is needed to judge and revalidate it."""
+
+    def __init__(self, status, headers, body, vary):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.vary = vary
+        self.variants = {}
+        self.variants_lock = threading.Lock()
+        self.size = len(body) + sum(len(name) + len(value) for name, value in headers)
+        self.refresh_freshness()
+
+    @classmethod
+    def from_response(cls, response, body, vary=None):
+        headers = [
+            (name, value) for name, value in response.headers.items()
+            if name.lower() not in CACHE_SKIP_HEADERS
+        ]
+        return cls(response.status, headers, body, vary or {})
+
+    def header(self, name):
+        name = name.lower()
+        for header, value in self.headers:
+            if header.lower() == name:
+                return value
+        return None
+
+    get = header
+
+    def refresh_freshness(self, initial_age=0):
+        # Freshness lifetime from s-maxage, max-age or Expires, in that order
+        # (RFC 7234 4.2.1); no-cache entries are stored but always revalidated
+        directives = parse_cache_control(self.header('Cache-Control'))
+        lifetime = 0.0
+        if 'no-cache' not in directives:
+            for directive in ('s-maxage', 'max-age'):
+                if directive in directives:
+                    try:
+                        lifetime = float(directives[directive])
+                    except (TypeError, ValueError):
+                        lifetime = 0.0
+                    break
+            else:
+                expires = parse_http_date(self.header('Expires'))
+                if expires is not None:
+                    date = parse_http_date(self.header('Date')) or time.time()
+                    lifetime = expires - date
+        self.stored_at = time.monotonic() - initial_age
+        self.fresh_until = self.stored_at + lifetime
+
+    def is_fresh(self):
+        return time.monotonic() < self.fresh_until
+
+    def age(self):
+        return int(time.monotonic() - self.stored_at)
+
+    def matches_vary(self, request_headers):
+        return all(request_headers.get(name) == value for name, value in self.vary.items())
+
+    def validators(self):
+        validators = {}
+        if self.header('ETag'):
+            validators['If-None-Match'] = self.header('ETag')
+        if self.header('Last-Modified'):
+            validators['If-Modified-Since'] = self.header('Last-Modified')
+        return validators
+
+    def not_modified_for(self, request_headers):
+        """True when a client's conditional request can be answered with 304."""
+        if_none_match = request_headers.get('If-None-Match')
+        if if_none_match is not None:
+            etag = self.header('ETag')
+            return etag is not None and etag_matches(if_none_match, etag)
+        since = parse_http_date(request_headers.get('If-Modified-Since'))
+        modified = parse_http_date(self.header('Last-Modified'))
+        return since is not None and modified is not None and modified <= since
+
+    def update_from(self, not_modified_headers):
+        # A 304 may carry refreshed metadata that replaces the stored values
+        updates = {
+            name.lower(): value for name, value in not_modified_headers.items()
+            if name.lower() in NOT_MODIFIED_HEADERS | {'date'}
+        }
+        self.headers = [
+            (name, value) for name, value in self.headers if name.lower() not in updates
+        ] + [(name, value) for name, value in not_modified_headers.items() if name.lower() in updates]
+        self.refresh_freshness()
+
+class ResponseCache:
+    """LRU cache of upstream GET responses bounded by total body bytes."""
+
+    def __init__(self, max_bytes, max_entry_bytes):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def request_is_cacheable(command, headers):
+        if command not in ('GET', 'HEAD') or 'Authorization' in headers:
+            return False
+        return 'no-store' not in parse_cache_control(headers.get('Cache-Control'))
+
+    @staticmethod
+    def request_wants_revalidation(headers):
+        return ('no-cache' in parse_cache_control(headers.get('Cache-Control'))
+                or 'no-cache' in headers.get('Pragma', ''))
+
+    def response_is_storable(self, response):
+        if response.status != 200 or response.headers.get('Set-Cookie'):
+            return False
+        if response.headers.get('Vary', '').strip() == '*':
+            return False
+        directives = parse_cache_control(response.headers.get('Cache-Control'))
+        if 'no-store' in directives or 'private' in directives:
+            return False
+        length = response.headers.get('Content-Length')
+        if length is not None and length.isdigit() and int(length) > self.max_entry_bytes:
+            return False
+        # Worth keeping only if it can be served fresh or revalidated later
+        return bool(
+            {'max-age', 's-maxage', 'no-cache'} & directives.keys()
+            or response.headers.get('Expires')
+            or response.headers.get('ETag')
+            or response.headers.get('Last-Modified')
+        )
+
+    def lookup(self, key, request_headers):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.matches_vary(request_headers):
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key, response, body, request_headers):
+        vary = {
+            name.strip(): request_headers.get(name.strip())
+            for name in response.headers.get('Vary', '').split(',') if name.strip()
+        }
+        initial_age = response.headers.get('Age', '0')
+        entry = CacheEntry.from_response(response, body, vary)
+        if initial_age.isdigit():
+            entry.refresh_freshness(int(initial_age))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[key] = entry
+            self._bytes += entry.size
+            self.stores += 1
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def add_variant(self, key, entry, encoding, body):
+        """Keep a compressed copy of a cached body, charged to the byte budget."""
+        with self._lock:
+            if self._entries.get(key) is not entry or encoding in entry.variants:
+                return
+            entry.variants[encoding] = body
+            entry.size += len(body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def refresh(self, entry, not_modified_headers):
+        with self._lock:
+            entry.update_from(not_modified_headers)
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.revalidated + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.revalidated) / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+class Flight:
+    """One in-progress upstream fetch that identical requests can wait on."""
+
+    def __init__(self):
+        self.result = None
+        self.cache_key = None
+        self.waiters = 0
+        self._done = threading.Event()
+
+    def wait(self, timeout):
+        return self.result if self._done.wait(timeout) else None
+
+    def publish(self, result, cache_key=None):
+        # Waiters are released as soon as the body is known, while the leader
+        # may still be writing it to its own client. cache_key is set when
+        # the result is also the response cache's entry
+        self.result = result
+        self.cache_key = cache_key
+        self._done.set()
+
+    def complete(self):
+        self._done.set()
+
+class SingleFlight:
+    """Coalesces concurrent identical GETs onto a single upstream fetch.
+
+    The first request for a key becomes the leader and fetches normally while
+    keeping a copy of the body; requests arriving before it finishes wait and
+    are answered from that copy. Followers fall back to their own fetch when
+    the leader fails or its response is not safe to share.
+    """
+
+    def __init__(self, max_body_bytes, wait_timeout):
+        self.max_body_bytes = max_body_bytes
+        self.wait_timeout = wait_timeout
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def request_is_coalescable(command, headers):
+        if not ResponseCache.request_is_cacheable(command, headers) or command != 'GET':
+            return False
+        return not any(name in headers for name in COALESCE_EXCLUDED_HEADERS)
+
+    @staticmethod
+    def key_for(command, path, headers):
+        return (command, path) + tuple(headers.get(name) for name in COALESCE_KEY_HEADERS)
+
+    @staticmethod
+    def response_is_shareable(response):
+        # Only a complete response can answer a follower's plain GET
+        if response.status != 200 or response.headers.get('Set-Cookie'):
+            return False
+        directives = parse_cache_control(response.headers.get('Cache-Control'))
+        return 'private' not in directives
+
+    def join(self, key):
+        """Return (flight, is_leader) for key."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            self.leaders += 1
+            return flight, True
+
+    def finish(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.complete()
+
+    def record(self, shared):
+        with self._lock:
+            if shared:
+                self.coalesced += 1
+            else:
+                self.fallbacks += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "fallbacks": self.fallbacks,
+            }
+
+def is_compressible(content_type):
+    media_type = (content_type or '').split(';', 1)[0].strip().lower()
+    return (media_type.startswith('text/') or media_type in COMPRESSIBLE_TYPES
+            or media_type.endswith('+json') or media_type.endswith('+xml'))
+
+def negotiate_encoding(accept_encoding, encodings):
+    """First of encodings (in preference order) that Accept-Encoding allows."""
+    offered = {}
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding.strip():
+            offered[coding.strip().lower()] = quality
+    for encoding in encodings:
+        if offered.get(encoding, offered.get('*', 0)) > 0:
+            return encoding
+    return None
+
+class StreamCompressor:
+    """Incremental gzip or brotli encoder flushed after every piece."""
+
+    def __init__(self, encoding, level):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=level)
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        # Sync-flushing each piece keeps bytes moving to the client instead of
+        # waiting for the encoder's internal buffer to fill
+        if self.encoding == 'br':
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class Compression:
+    """Accept-Encoding negotiation and compression policy for proxied responses."""
+
+    def __init__(self, min_size=1024, level=6):
+        self.min_size = min_size
+        self.level = level
+        self.encodings = (['br'] if brotli is not None else []) + ['gzip']
+        self._lock = threading.Lock()
+        self.streamed = 0
+        self.stored_variants = 0
+        self.shared_variants = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def negotiate(self, accept_encoding):
+        return negotiate_encoding(accept_encoding, self.encodings)
+
+    def encoding_for(self, request_headers, status, headers, length):
+        """The encoding to apply to a response, or None to send it as-is."""
+        if status != 200 or headers.get('Content-Encoding'):
+            return None
+        if not is_compressible(headers.get('Content-Type')):
+            return None
+        if 'no-transform' in parse_cache_control(headers.get('Cache-Control')):
+            return None
+        if length is not None and length < self.min_size:
+            return None
+        return self.negotiate(request_headers.get('Accept-Encoding'))
+
+    def stream_compressor(self, encoding):
+        level = BROTLI_STREAM_QUALITY if encoding == 'br' else self.level
+        with self._lock:
+            self.streamed += 1
+        return StreamCompressor(encoding, level)
+
+    def compress_stored(self, body, encoding, cached=True):
+        """Compress a whole body at the stored settings.
+
+        cached says whether the result is kept for later requests, in the
+        response cache or on a static file, or only on a coalesced response
+        shared by the requests waiting on it.
+        """
+        if encoding == 'br':
+            compressed = brotli.compress(body, quality=BROTLI_STORED_QUALITY)
+        else:
+            compressed = zlib.compress(body, GZIP_STORED_LEVEL, wbits=31)
+        with self._lock:
+            if cached:
+                self.stored_variants += 1
+            else:
+                self.shared_variants += 1
+        return compressed
+
+    def record(self, bytes_in, bytes_out):
+        with self._lock:
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+
+    def stats(self):
+        with self._lock:
+            return {
+                "encodings": self.encodings,
+                "streamed_responses": self.streamed,
+                "stored_variants": self.stored_variants,
+                "shared_variants": self.shared_variants,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else 0.0,
+            }
+
+class StaticFile:
+    """Metadata for one file under the static root, taken from os.stat."""
+
+    def __init__(self, path, stat, url_path):
+        self.path = path
+        self.url_path = url_path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if url_path.startswith(IMMUTABLE_STATIC_PREFIX):
+            self.cache_control = 'public, max-age=31536000, immutable'
+        else:
+            self.cache_control = 'no-cache'
+        # encoding -> (path, size) of precompressed siblings such as app.js.br
+        self.precompressed = {}
+        # encoding -> body compressed by the proxy, for files without siblings
+        self.compressed = {}
+        self._compress_lock = threading.Lock()
+
+    def changed(self, stat):
+        return stat.st_mtime_ns != self.mtime_ns or stat.st_size != self.size
+
+    def refreshed(self, stat):
+        """A StaticFile for the file's new stat, with its siblings stat'ed afresh."""
+        refreshed = StaticFile(self.path, stat, self.url_path)
+        for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            try:
+                refreshed.precompressed[encoding] = (self.path + suffix, os.stat(self.path + suffix).st_size)
+            except OSError:
+                pass
+        return refreshed
+
+    def compressible(self, compression):
+        return (not self.precompressed and is_compressible(self.content_type)
+                and compression.min_size <= self.size <= STATIC_COMPRESS_MAX_BYTES)
+
+    def compressed_body(self, encoding, compression):
+        """The file compressed with encoding, or None if it changed while being read.
+
+        Produced on first use and kept on this object, which is replaced as
+        soon as the file changes, so each version is compressed once.
+        """
+        with self._compress_lock:
+            body = self.compressed.get(encoding)
+            if body is None:
+                with open(self.path, 'rb') as f:
+                    data = f.read()
+                    if self.changed(os.fstat(f.fileno())):
+                        return None
+                body = self.compressed[encoding] = compression.compress_stored(data, encoding)
+            return body
+
+class StaticIndex:
+    """In-memory index of the files under a static root, keyed by URL path.
+
+    Lookups never touch the directory tree; the tree is rescanned at most
+    every ``rescan_interval`` seconds when a lookup misses, and a hit is
+    re-validated with a single stat so rebuilt files get fresh ETags.
+    """
+
+    def __init__(self, root, rescan_interval=2.0, spa_fallback=False, exclude_prefixes=()):
+        self.root = os.path.abspath(root)
+        self.exclude_prefixes = [prefix.rstrip('/') for prefix in exclude_prefixes]
+        self.rescan_interval = rescan_interval
+        self.spa_fallback = spa_fallback
+        self._files = {}
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self.served = 0
+        self.not_modified = 0
+        self.ranges = 0
+        self.bytes_sent = 0
+        self.scan()
+
+    def scan(self):
+        files = {}
+        siblings = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                url_path = '/' + os.path.relpath(path, self.root).replace(os.sep, '/')
+                files[url_path] = StaticFile(path, stat, url_path)
+                for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+                    if url_path.endswith(suffix):
+                        siblings.append((url_path[:-len(suffix)], encoding, path, stat.st_size))
+        for url_path, encoding, path, size in siblings:
+            if url_path in files:
+                files[url_path].precompressed[encoding] = (path, size)
+        self._files = files
+        self._scanned_at = time.monotonic()
+
+    def lookup(self, path):
+        url_path = posixpath.normpath(urllib.parse.unquote(path.split('?', 1)[0]))
+        for prefix in self.exclude_prefixes:
+            # API paths always go upstream, even if a file happens to match
+            if url_path == prefix or url_path.startswith(prefix + '/'):
+                return None
+        static_file = self._files.get(url_path) or self._files.get(url_path.rstrip('/') + '/index.html')
+        if static_file is None:
+            with self._lock:
+                if time.monotonic() - self._scanned_at >= self.rescan_interval:
+                    self.scan()
+            static_file = self._files.get(url_path) or self._files.get(url_path.rstrip('/') + '/index.html')
+        if static_file is None and self.spa_fallback and '.' not in posixpath.basename(url_path):
+            # Client-side routes such as /accounting are rendered by index.html
+            static_file = self._files.get('/index.html')
+        if static_file is None:
+            return None
+        try:
+            stat = os.stat(static_file.path)
+        except OSError:
+            self._files.pop(static_file.url_path, None)
+            return None
+        if static_file.changed(stat):
+            static_file = self.refresh(static_file, stat)
+        return static_file
+
+    def refresh(self, static_file, stat):
+        # Keyed by the file found, not the path asked for, which may be an
+        # SPA route or a directory answered by its index.html
+        refreshed = static_file.refreshed(stat)
+        self._files[static_file.url_path] = refreshed
+        return refreshed
+
+    def record(self, status, sent):
+        with self._lock:
+            if status == 304:
+                self.not_modified += 1
+            else:
+                self.served += 1
+                if status == 206:
+                    self.ranges += 1
+            self.bytes_sent += sent
+
+    def stats(self):
+        with self._lock:
+            return {
+                "root": self.root,
+                "files": len(self._files),
+                "served": self.served,
+                "not_modified": self.not_modified,
+                "ranges": self.ranges,
+                "bytes_sent": self.bytes_sent,
+            }
+
+def parse_range(header, size):
+    """(start, end) inclusive for a single byte range, None to ignore the header,
+    or 'unsatisfiable'. Multiple ranges are answered with the whole file."""
+    unit, _, spec = (header or '').partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, sep, last = spec.strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if first == '':
+            suffix = int(last)
+            if suffix <= 0:
+                return 'unsatisfiable'
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return 'unsatisfiable'
+    return start, min(end, size - 1)
+
+class BodyCapture:
+    """Collects a copy of a relayed body for the cache, giving up past a size limit.
+
+    read_ahead, when given, is asked after each piece whether the rest of the
+    body should be read from the upstream before any more is written to the
+    client; on_complete is called with the body once the upstream has sent it.
+    """
+
+    def __init__(self, limit, read_ahead=None, on_complete=None):
+        self.limit = limit
+        self.read_ahead = read_ahead
+        self.on_complete = on_complete
+        self.parts = []
+        self.size = 0
+        self.overflowed = False
+
+    def add(self, data):
+        if self.overflowed:
+            return
+        self.size += len(data)
+        if self.size > self.limit:
+            self.overflowed = True
+            self.parts = []
+        else:
+            self.parts.append(data)
+
+    def body(self):
+        return None if self.overflowed else b''.join(self.parts)
+
+    def wants_read_ahead(self):
+        return not self.overflowed and self.read_ahead is not None and self.read_ahead()
+
+    def complete(self):
+        if self.on_complete is not None and not self.overflowed:
+            self.on_complete(self.body())
+
+class TunnelHub(threading.Thread):
+    """Relays bytes for upgraded connections (WebSockets) on one selector thread.
+
+    Once the upstream has answered 101 Switching Protocols, both sockets are
+    handed over here and the worker thread is released, so idle sockets cost
+    a selector registration rather than a parked thread. Each direction
+    buffers at most ``max_buffer`` bytes; past that the sending side stops
+    being read until the receiver catches up.
+    """
+
+    def __init__(self, max_buffer=256 * 1024):
+        super().__init__(name="proxy-tunnels", daemon=True)
+        self.max_buffer = max_buffer
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        self._incoming = []
+        self._lock = threading.Lock()
+        self._stopped = False
+        self.active = 0
+        self.opened = 0
+        self.bytes_up = 0
+        self.bytes_down = 0
+
+    def add(self, client, upstream, client_pending=b'', upstream_pending=b''):
+        with self._lock:
+            self._incoming.append((client, upstream, client_pending, upstream_pending))
+            self.active += 1
+            self.opened += 1
+        self._wake()
+
+    def stop(self):
+        self._stopped = True
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wakeup_send.send(b'\0')
+        except OSError:
+            pass
+
+    def run(self):
+        while not self._stopped:
+            for key, mask in self._selector.select():
+                if key.fileobj is self._wakeup_recv:
+                    self._accept_incoming()
+                    continue
+                side = key.data
+                if side.closed:
+                    continue
+                try:
+                    if mask & selectors.EVENT_READ:
+                        self._read(side)
+                    if mask & selectors.EVENT_WRITE:
+                        self._write(side)
+                except OSError:
+                    self._close(side)
+                    continue
+                if side.finished() and side.peer.finished():
+                    self._close(side)
+                elif not side.closed:
+                    self._update(side)
+                    self._update(side.peer)
+        for key in list(self._selector.get_map().values()):
+            if key.data is not None:
+                self._close(key.data)
+
+    def _accept_incoming(self):
+        try:
+            while self._wakeup_recv.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        with self._lock:
+            incoming, self._incoming = self._incoming, []
+        for client, upstream, client_pending, upstream_pending in incoming:
+            client.setblocking(False)
+            upstream.setblocking(False)
+            client_side = _TunnelSide(client, upstream_pending, 'down')
+            upstream_side = _TunnelSide(upstream, client_pending, 'up')
+            client_side.peer, upstream_side.peer = upstream_side, client_side
+            self._update(client_side)
+            self._update(upstream_side)
+
+    def _read(self, side):
+        data = side.sock.recv(CHUNK_SIZE)
+        if data:
+            side.peer.outbuf += data
+            if side.peer.direction == 'up':
+                self.bytes_up += len(data)
+            else:
+                self.bytes_down += len(data)
+        else:
+            side.read_closed = True
+        if side.read_closed and not side.peer.outbuf:
+            side.peer.shutdown_write()
+
+    def _write(self, side):
+        sent = side.sock.send(side.outbuf)
+        del side.outbuf[:sent]
+        if not side.outbuf and side.peer.read_closed:
+            side.shutdown_write()
+
+    def _update(self, side):
+        if side.closed:
+            return
+        events = 0
+        if not side.read_closed and len(side.peer.outbuf) < self.max_buffer:
+            events |= selectors.EVENT_READ
+        if side.outbuf:
+            events |= selectors.EVENT_WRITE
+        if side.registered and not events:
+            self._selector.unregister(side.sock)
+            side.registered = False
+        elif side.registered:
+            self._selector.modify(side.sock, events, side)
+        elif events:
+            self._selector.register(side.sock, events, side)
+            side.registered = True
+
+    def _close(self, side):
+        if side.closed and side.peer.closed:
+            return
+        for each in (side, side.peer):
+            if each.closed:
+                continue
+            if each.registered:
+                self._selector.unregister(each.sock)
+                each.registered = False
+            each.closed = True
+            each.sock.close()
+        with self._lock:
+            self.active -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": self.active,
+                "opened": self.opened,
+                "bytes_up": self.bytes_up,
+                "bytes_down": self.bytes_down,
+            }
+
+class PrefetchedSocket(io.RawIOBase):
+    """Socket stand-in for http.client whose reads start with bytes already received."""
+
+    def __init__(self, sock, data):
+        self.sock = sock
+        self.data = data
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.data:
+            return self.sock.recv_into(buffer)
+        count = min(len(buffer), len(self.data))
+        buffer[:count] = self.data[:count]
+        self.data = self.data[count:]
+        return count
+
+    def makefile(self, mode):
+        return io.BufferedReader(self)
+
+class _TunnelSide:
+    """One socket of a tunnel and the bytes still waiting to be written to it."""
+
+    def __init__(self, sock, pending, direction):
+        self.sock = sock
+        self.outbuf = bytearray(pending)
+        self.direction = direction
+        self.peer = None
+        self.read_closed = False
+        self.write_closed = False
+        self.registered = False
+        self.closed = False
+
+    def shutdown_write(self):
+        if not self.write_closed:
+            self.write_closed = True
+            try:
+                self.sock.shutdown(socket.SHUT_WR)
+            except OSError:
+                pass
+
+    def finished(self):
+        return self.read_closed and self.write_closed
+
+class RateLimiter:
+    """Token buckets per client, with a separate budget for each class of traffic.
+
+    Buckets are kept in last-use order, so a request costs one dict lookup and
+    a move to the end, and buckets idle long enough to have refilled are
+    evicted from the front - forgetting them loses nothing. State is per
+    process: pre-forked workers each enforce the budgets on their own.
+    """
+
+    def __init__(self, budgets, max_keys=100000):
+        self.budgets = budgets  # name -> (tokens per second, burst)
+        self.idle_timeout = max(burst / rate for rate, burst in budgets.values())
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # (budget, client) -> [tokens, updated_at]
+        self._lock = threading.Lock()
+        self.allowed = dict.fromkeys(budgets, 0)
+        self.limited = dict.fromkeys(budgets, 0)
+        self.evictions = 0
+
+    def check(self, budget, client):
+        """Take a token; returns 0 if allowed, else seconds until one is available."""
+        rate, burst = self.budgets[budget]
+        key = (budget, client)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._evict_idle(now)
+                bucket = self._buckets[key] = [burst, now]
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                self.allowed[budget] += 1
+                return 0.0
+            self.limited[budget] += 1
+            return (1 - bucket[0]) / rate
+
+    def _evict_idle(self, now):
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < self.idle_timeout and len(self._buckets) < self.max_keys:
+                break
+            del self._buckets[key]
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clients": len(self._buckets),
+                "budgets": {
+                    name: {"rate": rate, "burst": burst, "allowed": self.allowed[name],
+                           "limited": self.limited[name]}
+                    for name, (rate, burst) in self.budgets.items()
+                },
+                "evictions": self.evictions,
+            }
+
+# Histogram bucket upper bounds in seconds, from a cache hit to a slow report
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Fixed-bucket latency histogram; callers serialise access."""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def format_labels(labels):
+    escape = lambda value: str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels) + '}'
+
+class Metrics:
+    """Per-route and per-upstream request metrics in Prometheus text format.
+
+    Recording a request takes one lock and a handful of dict updates, so it
+    stays cheap on the hot path; all formatting happens when scraped.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests = {}     # (route, upstream, status class) -> count
+        self._bytes = {}        # (route, upstream, direction) -> bytes
+        self._durations = {}    # (route, upstream) -> Histogram
+        self._ttfb = {}         # upstream -> Histogram
+        self._connect = {}      # upstream -> Histogram
+
+    def record_request(self, route, upstream, status, bytes_in, bytes_out, duration,
+                       ttfb=None, connect=None):
+        status_class = f"{status // 100}xx" if status else "none"
+        with self._lock:
+            key = (route, upstream, status_class)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for direction, count in (('in', bytes_in), ('out', bytes_out)):
+                key = (route, upstream, direction)
+                self._bytes[key] = self._bytes.get(key, 0) + count
+            histogram = self._durations.get((route, upstream))
+            if histogram is None:
+                histogram = self._durations[(route, upstream)] = Histogram()
+            histogram.observe(duration)
+            if ttfb is not None:
+                histogram = self._ttfb.get(upstream)
+                if histogram is None:
+                    histogram = self._ttfb[upstream] = Histogram()
+                histogram.observe(ttfb)
+            if connect is not None:
+                histogram = self._connect.get(upstream)
+                if histogram is None:
+                    histogram = self._connect[upstream] = Histogram()
+                histogram.observe(connect)
+
+    def render(self, server):
+        with self._lock:
+            requests = dict(self._requests)
+            byte_counts = dict(self._bytes)
+            histograms = [
+                ('proxy_request_duration_seconds', 'Time from request line to last byte sent',
+                 {key: self._copy(h) for key, h in self._durations.items()}, ('route', 'upstream')),
+                ('proxy_upstream_ttfb_seconds', 'Time from sending a request upstream to its response headers',
+                 {(key,): self._copy(h) for key, h in self._ttfb.items()}, ('upstream',)),
+                ('proxy_upstream_connect_seconds', 'Time to open a new upstream connection',
+                 {(key,): self._copy(h) for key, h in self._connect.items()}, ('upstream',)),
+            ]
+
+        lines = [
+            '# HELP proxy_worker_info Worker process serving this scrape',
+            '# TYPE proxy_worker_info gauge',
+            f'proxy_worker_info{format_labels([("pid", os.getpid())])} 1',
+            '# HELP proxy_requests_total Requests handled, by route, upstream and status class',
+            '# TYPE proxy_requests_total counter',
+        ]
+        for (route, upstream, status), count in sorted(requests.items()):
+            labels = format_labels([('route', route), ('upstream', upstream), ('status', status)])
+            lines.append(f'proxy_requests_total{labels} {count}')
+        lines += ['# HELP proxy_bytes_total Body bytes received from and sent to clients',
+                  '# TYPE proxy_bytes_total counter']
+        for (route, upstream, direction), count in sorted(byte_counts.items()):
+            labels = format_labels([('route', route), ('upstream', upstream), ('direction', direction)])
+            lines.append(f'proxy_bytes_total{labels} {count}')
+
+        for name, help_text, series, label_names in histograms:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+            for key, (counts, total, count) in sorted(series.items()):
+                labels = list(zip(label_names, key))
+                cumulative = 0
+                for bound, bucket in zip(LATENCY_BUCKETS + (float('inf'),), counts):
+                    cumulative += bucket
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{format_labels(labels + [("le", le)])} {cumulative}')
+                lines.append(f'{name}_sum{format_labels(labels)} {total:.6f}')
+                lines.append(f'{name}_count{format_labels(labels)} {count}')
+
+        lines += [
+            '# HELP proxy_rejected_connections_total Connections answered with 503 because the proxy was saturated',
+            '# TYPE proxy_rejected_connections_total counter',
+            f'proxy_rejected_connections_total {server.rejected}',
+        ]
+        lines += self._gauges(server)
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _copy(histogram):
+        return list(histogram.counts), histogram.sum, histogram.count
+
+    @staticmethod
+    def _gauges(server):
+        # Point-in-time values from the components' own stats
+        lines = []
+        series = [
+            ('proxy_pool_hits_total', 'counter', 'Requests that reused a pooled upstream connection', 'hits'),
+            ('proxy_pool_misses_total', 'counter', 'Requests that opened a new upstream connection', 'misses'),
+            ('proxy_pool_idle_connections', 'gauge', 'Idle keep-alive connections per upstream', 'idle'),
+            ('proxy_upstream_outstanding', 'gauge', 'Requests in flight per upstream', 'outstanding'),
+        ]
+        stats = [
+            (format_labels([('group', name), ('upstream', upstream.url)]), upstream.stats())
+            for name, group in server.router.groups().items() for upstream in group.upstreams
+        ]
+        for name, kind, help_text, field in series:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            for labels, upstream_stats in stats:
+                lines.append(f'{name}{labels} {upstream_stats[field]}')
+        lines += ['# HELP proxy_circuit_open Whether an upstream\'s circuit breaker is not closed',
+                  '# TYPE proxy_circuit_open gauge']
+        for labels, upstream_stats in stats:
+            is_open = int(upstream_stats['circuit']['state'] != CircuitBreaker.CLOSED)
+            lines.append(f'proxy_circuit_open{labels} {is_open}')
+
+        components = [
+            ('cache', server.cache, {'hits': 'counter', 'revalidated': 'counter', 'misses': 'counter',
+                                     'evictions': 'counter', 'bytes': 'gauge', 'entries': 'gauge'}),
+            ('coalescing', server.flights, {'leaders': 'counter', 'coalesced': 'counter',
+                                            'fallbacks': 'counter'}),
+            ('tunnels', server.tunnels, {'opened': 'counter', 'active': 'gauge'}),
+            ('access_log', server.access_log, {'written': 'counter', 'dropped': 'counter',
+                                               'queued': 'gauge'}),
+        ]
+        if server.limiter is not None:
+            limiter_stats = server.limiter.stats()
+            for field, kind in (('allowed', 'counter'), ('limited', 'counter')):
+                name = f'proxy_rate_limit_{field}_total'
+                lines.append(f'# TYPE {name} {kind}')
+                for budget, budget_stats in limiter_stats['budgets'].items():
+                    lines.append(f'{name}{format_labels([("budget", budget)])} {budget_stats[field]}')
+            lines += ['# TYPE proxy_rate_limit_clients gauge',
+                      f'proxy_rate_limit_clients {limiter_stats["clients"]}']
+        for prefix, component, fields in components:
+            if component is None:
+                continue
+            component_stats = component.stats()
+            for field, kind in fields.items():
+                name = f'proxy_{prefix}_{field}' + ('_total' if kind == 'counter' else '')
+                lines += [f'# TYPE {name} {kind}', f'{name} {component_stats[field]}']
+        return lines
+
+class CountingWriter:
+    """Wraps a handler's wfile to count the bytes written to the client."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def write(self, data):
+        self.count += len(data)
+        return self.raw.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+class AccessLog(threading.Thread):
+    """JSON-lines access log written by a background thread.
+
+    Request handlers only put a dict on a bounded queue; serialising,
+    writing and rotating happen here in batches. When the queue is full the
+    record is dropped and counted rather than making the request wait.
+    Several worker processes can share one file: rotation happens under an
+    exclusive lock and the others reopen the file when they see it moved.
+    """
+
+    BATCH_SIZE = 512
+    FLUSH_INTERVAL = 0.5
+
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=5, buffer_size=10000):
+        super().__init__(name="access-log", daemon=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue = queue.Queue(buffer_size)
+        self._file = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+    def log(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def stop(self):
+        # The sentinel goes through a blocking put so it is never dropped
+        self._queue.put(None)
+        self.join()
+
+    def run(self):
+        self._open()
+        stopping = False
+        while not stopping:
+            try:
+                batch = [self._queue.get(timeout=self.FLUSH_INTERVAL)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                stopping = True
+            if batch:
+                self._write(batch)
+        if self._file not in (sys.stdout, sys.stderr):
+            self._file.close()
+
+    def _write(self, batch):
+        lines = []
+        for record in batch:
+            timestamp = record.get('time')
+            if isinstance(timestamp, float):
+                record['time'] = (time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(timestamp))
+                                  + f'.{int(timestamp % 1 * 1000):03d}Z')
+            lines.append(json.dumps(record, separators=(',', ':')))
+        try:
+            if self._file not in (sys.stdout, sys.stderr):
+                self._reopen_if_moved()
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+            with self._lock:
+                self.written += len(batch)
+            if self.max_bytes and self._file not in (sys.stdout, sys.stderr) \
+                    and self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            with self._lock:
+                self.dropped += len(batch)
+            print(f"access log: {e}", file=sys.stderr)
+
+    def _open(self):
+        if self.path == '-':
+            self._file = sys.stdout
+        else:
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _reopen_if_moved(self):
+        try:
+            moved = os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            moved = True
+        if moved:
+            self._file.close()
+            self._open()
+
+    def _rotate(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            # Another worker may have rotated while this one waited for the lock
+            if os.stat(self.path).st_ino == os.fstat(self._file.fileno()).st_ino:
+                for index in range(self.backups - 1, 0, -1):
+                    if os.path.exists(f"{self.path}.{index}"):
+                        os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+                if self.backups:
+                    os.replace(self.path, f"{self.path}.1")
+                else:
+                    os.truncate(self.path, 0)
+                with self._lock:
+                    self.rotations += 1
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._open()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "path": self.path,
+                "queued": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "rotations": self.rotations,
+            }
+
+class RequestBody:
+    """Iterates over a client request body in CHUNK_SIZE pieces without buffering it.
+
+    ``length`` is the Content-Length, or None for a chunked body whose framing
+    is decoded here and re-encoded by http.client on the way upstream.
+    """
+
+    def __init__(self, rfile, length):
+        self.rfile = rfile
+        self.length = length
+        self.started = False
+        self.consumed = 0
+
+    def __iter__(self):
+        self.started = True
+        try:
+            if self.length is None:
+                yield from self._iter_chunked()
+            else:
+                yield from self._iter_exact(self.length)
+        except TimeoutError:
+            raise RequestBodyTimeout("timed out waiting for the request body")
+
+    def _iter_exact(self, remaining):
+        while remaining > 0:
+            data = self.rfile.read(min(remaining, CHUNK_SIZE))
+            if not data:
+                raise RequestBodyError("client closed the connection mid-body")
+            remaining -= len(data)
+            self.consumed += len(data)
+            yield data
+
+    def _iter_chunked(self):
+        while True:
+            line = self.rfile.readline(1024)
+            try:
+                size = int(line.split(b';', 1)[0].strip(), 16)
+            except ValueError:
+                raise RequestBodyError(f"invalid chunk size line {line[:32]!r}")
+            if size == 0:
+                break
+            yield from self._iter_exact(size)
+            if self.rfile.readline(1024) not in (b'\r\n', b'\n'):
+                raise RequestBodyError("missing CRLF after chunk data")
+        # Discard trailer fields up to the terminating empty line
+        while self.rfile.readline(1024) not in (b'\r\n', b'\n', b''):
+            pass
 
 class ProxyHandler(http.server.SimpleHTTPRequestHandler):
-    def do_GET(self):
+    protocol_version = "HTTP/1.1"
+    # Status line and headers are flushed before the body is written; with
+    # Nagle on, small bodies then wait ~40ms for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # Bounds each read of a request line, headers or body; the wait for
+        # a request to start is bounded by the keep-alive timeout instead
+        self.timeout = self.server.client_timeout
+        super().setup()
+        self.wfile = CountingWriter(self.wfile)
+
+    def handle_one_request(self):
+        # Waiting for the next request, the connection counts as idle and a
+        # draining server may close it
+        if not self.server.connection_idle(self.connection, True):
+            self.close_connection = True
+            return
+        try:
+            self.connection.settimeout(self.server.keep_alive_timeout)
+            waiting = self.rfile.peek(1)
+            self.connection.settimeout(self.server.client_timeout)
+        except OSError:
+            waiting = b''
+        finally:
+            self.server.connection_idle(self.connection, False)
+        if not waiting:
+            self.close_connection = True
+            return
+        super().handle_one_request()
+
+    def send_response(self, code, message=None):
+        self.response_status = code
+        self.connection_header_sent = False
+        if not self.server.keep_alive:
+            # Serving one connection at a time, a kept-alive client would
+            # block every other client until the client timeout
+            self.close_connection = True
+        # From here on the connection is mostly written to; a client that stops
+        # reading for longer than this is dropped rather than holding a worker
+        self.connection.settimeout(self.server.client_write_timeout)
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == 'connection':
+            self.connection_header_sent = True
+        super().send_header(keyword, value)
+
+    def end_headers(self):
+        if self.close_connection and not getattr(self, 'connection_header_sent', True):
+            self.send_header('Connection', 'close')
+        super().end_headers()
+
+    def log_request(self, code='-', size='-'):
+        # With an access log the finished request is logged there instead,
+        # with its timings and sizes
+        if self.server.access_log is None:
+            super().log_request(code, size)
+
+    def log_error(self, format, *args):
+        if self.server.access_log is None:
+            super().log_error(format, *args)
+        else:
+            self.server.access_log.log({
+                "time": time.time(), "level": "error", "client": self.client_address[0],
+                "request": getattr(self, 'requestline', ''), "message": format % args, "pid": os.getpid(),
+            })
+
+    def proxy_request(self):
+        received_at = time.time()
+        started = time.perf_counter()
+        written_before = self.wfile.count
+        self.response_status = None
+        self.upstream_label = 'proxy'
+        self.request_body_reader = None
+        self.timings = {}
         try:
-            # Forward request to localhost:3000
-            target_url = f"http://localhost:3000{self.path}"
+            self.route_request()
+        finally:
+            route = self.server.router.route(self.path)[0]
+            if self.upstream_label == 'static':
+                route = 'static'
+            bytes_in = self.request_body_reader.consumed if self.request_body_reader else 0
+            bytes_out = self.wfile.count - written_before + self.timings.get('sendfile_bytes', 0)
+            duration = time.perf_counter() - started
+            ttfb = self.timings.get('ttfb')
+            connect = self.timings.get('connect')
+            self.server.metrics.record_request(
+                route, self.upstream_label, self.response_status, bytes_in, bytes_out, duration,
+                ttfb=ttfb, connect=connect,
+            )
+            if self.server.access_log is not None:
+                self.server.access_log.log({
+                    "time": received_at, "client": self.client_address[0],
+                    "method": self.command, "path": self.path, "status": self.response_status,
+                    "route": route, "upstream": self.upstream_label,
+                    "bytes_in": bytes_in, "bytes_out": bytes_out,
+                    "duration_ms": round(duration * 1000, 3),
+                    "ttfb_ms": round(ttfb * 1000, 3) if ttfb is not None else None,
+                    "connect_ms": round(connect * 1000, 3) if connect is not None else None,
+                    "pid": os.getpid(),
+                })
+            if not self.close_connection:
+                self.connection.settimeout(self.server.client_timeout)
+
+    def route_request(self):
+        if self.server.draining:
+            # Let clients reconnect to a worker that is not shutting down
+            self.close_connection = True
 
-            # Create request
-            req = urllib.request.Request(target_url)
+        if self.path in ('/__proxy/stats', '/__proxy/metrics'):
+            if not self.from_loopback():
+                # Both expose upstream addresses, pids and internal counters
+                self.send_error(404)
+            elif self.path == '/__proxy/stats':
+                self.send_stats()
+            else:
+                self.send_metrics()
+            return
+
+        if self.server.limiter is not None and self.rate_limited():
+            return
+
+        if self.is_upgrade_request():
+            self.tunnel_upgrade()
+            return
+
+        static = self.server.static
+        if static is not None and self.command in ('GET', 'HEAD'):
+            static_file = static.lookup(self.path)
+            if static_file is not None:
+                self.upstream_label = 'static'
+                if self.send_static(static_file):
+                    return
+                self.upstream_label = 'proxy'
+
+        cache = self.server.cache
+        cache_key = None
+        entry = None
+        if cache is not None and cache.request_is_cacheable(self.command, self.headers):
+            cache_key = self.path
+            entry = cache.lookup(cache_key, self.headers)
+            if entry is not None and entry.is_fresh() and not cache.request_wants_revalidation(self.headers):
+                cache.record('hits')
+                self.upstream_label = 'cache'
+                self.send_cached(entry, cache_key)
+                return
+
+        flights = self.server.flights
+        if flights is not None and flights.request_is_coalescable(self.command, self.headers):
+            key = flights.key_for(self.command, self.path, self.headers)
+            flight, leader = flights.join(key)
+            if leader:
+                try:
+                    self.forward(cache_key, entry, flight)
+                finally:
+                    flights.finish(key, flight)
+                return
+            shared = flight.wait(flights.wait_timeout)
+            flights.record(shared is not None)
+            if shared is not None:
+                self.upstream_label = 'coalesced'
+                self.send_cached(shared, flight.cache_key)
+                return
+
+        self.forward(cache_key, entry)
+
+    def forward(self, cache_key=None, entry=None, flight=None):
+        group = self.server.router.match(self.path)
+        try:
+            upstream = group.acquire()
+        except NoHealthyUpstream as e:
+            # Fail fast rather than queueing behind upstreams known to be down
+            self.close_connection = True
+            self.send_response(503)
+            self.send_header('Retry-After', str(max(1, round(group.upstreams[0].breaker.reset_timeout))))
+            self.send_header('Content-Length', '0')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            self.log_error("%s", e)
+            return
+
+        self.upstream_label = upstream.url
+        cache = self.server.cache
+        pool = upstream.pool
+        conn = None
+        headers_sent = False
+        upstream_ok = None
+        try:
+            # Forward request to the upstream over a pooled connection, asking
+            # it to confirm a stale cached copy rather than resend the body
+            validators = entry.validators() if entry is not None else None
+            conn, response = self.open_upstream(pool, validators)
+            upstream_ok = True
+            headers_sent = True
+
+            if entry is not None and response.status == 304:
+                response.read()
+                cache.refresh(entry, response.headers)
+                cache.record('revalidated')
+                if flight is not None:
+                    flight.publish(entry, cache_key)
+                self.send_cached(entry, cache_key)
+            else:
+                # One copy of the body serves both the cache and any requests
+                # waiting on this fetch, each applying its own size limit
+                storable = (cache_key is not None and self.command == 'GET'
+                            and cache.response_is_storable(response))
+                shareable = flight is not None and self.server.flights.response_is_shareable(response)
+                if cache_key is not None:
+                    cache.record('misses')
+                capture = None
+                if storable or shareable:
+                    limits = []
+                    read_ahead = publish = None
+                    if storable:
+                        limits.append(cache.max_entry_bytes)
+                    if shareable:
+                        max_body_bytes = self.server.flights.max_body_bytes
+                        limits.append(max_body_bytes)
+
+                        def publish(body):
+                            if len(body) <= max_body_bytes:
+                                flight.publish(CacheEntry.from_response(response, body))
+
+                        # With requests waiting, the body is read from the
+                        # upstream ahead of the leader's client, so a slow
+                        # download there does not hold back every follower
+                        read_ahead = lambda: flight.waiters > 0
+                    capture = BodyCapture(max(limits), read_ahead, publish)
+                self.relay_response(response, capture)
+                body = capture.body() if capture is not None else None
+                if body is not None:
+                    if storable and len(body) <= cache.max_entry_bytes:
+                        cache.store(cache_key, response, body, self.headers)
+                    if shareable and flight.result is None:
+                        # Bodiless responses such as 204 are never streamed
+                        publish(body)
+
+            # Only a fully read, keep-alive response leaves the connection reusable
+            reusable = not response.will_close and (response.isclosed() or response.length == 0)
+            response.close()
+            if reusable:
+                pool.release(conn)
+                conn = None
+
+        except RequestBodyError as e:
+            self.close_connection = True
+            if isinstance(e, RequestBodyTimeout):
+                self._fail(headers_sent, 408, f"Request Timeout: {e}")
+            else:
+                self._fail(headers_sent, 400, f"Bad Request: {e}")
+        except TimeoutError:
+            if headers_sent:
+                # Mid-response this is as likely a client that stopped reading
+                self._fail(True, 504, "Timed out relaying the response")
+            else:
+                upstream_ok = False
+                self._fail(False, 504, "Gateway Timeout: upstream did not respond in time")
+        except (OSError, http.client.HTTPException) as e:
+            if not headers_sent:
+                upstream_ok = False
+            self._fail(headers_sent, 502, f"Bad Gateway: {e}")
+        except Exception as e:
+            self._fail(headers_sent, 500, f"Internal Server Error: {e}")
+        finally:
+            if conn is not None:
+                pool.discard(conn)
+            upstream.breaker.record(upstream_ok)
+            group.release(upstream)
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_OPTIONS = proxy_request
+
+    def rate_limited(self):
+        """Answer 429 and return True if the client is over its budget for this path."""
+        limiter = self.server.limiter
+        route, _ = self.server.router.route(self.path)
+        budget = 'static' if route == '/' else 'api'
+        if budget not in limiter.budgets:
+            return False
+        client = self.client_address[0]
+        if self.server.rate_limit_by == 'auth' and 'Authorization' in self.headers:
+            client = self.headers['Authorization']
+        wait = limiter.check(budget, client)
+        if not wait:
+            return False
+        self.upstream_label = 'limited'
+        if 'Content-Length' in self.headers or 'Transfer-Encoding' in self.headers:
+            # The body is never read, so the connection cannot carry another request
+            self.close_connection = True
+        self.send_response(429)
+        self.send_header('Retry-After', str(math.ceil(wait)))
+        self.send_header('Content-Length', '0')
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        return True
+
+    def from_loopback(self):
+        try:
+            address = ipaddress.ip_address(self.client_address[0])
+        except ValueError:
+            return False
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        return address.is_loopback
 
-            # Copy headers from original request
+    def is_upgrade_request(self):
+        tokens = {token.strip().lower() for token in self.headers.get('Connection', '').split(',')}
+        return 'upgrade' in tokens and 'Upgrade' in self.headers
+
+    def tunnel_upgrade(self):
+        group = self.server.router.match(self.path)
+        try:
+            upstream = group.acquire()
+        except NoHealthyUpstream as e:
+            self.send_error(503, f"Service Unavailable: {e}")
+            return
+
+        self.upstream_label = upstream.url
+        self.close_connection = True
+        sock = None
+        try:
+            sock = socket.create_connection(
+                (upstream.pool.host, upstream.pool.port), timeout=upstream.pool.connect_timeout
+            )
+            sock.settimeout(upstream.pool.read_timeout)
+            # Upgrade and Connection are hop-by-hop, but an upgrade handshake
+            # only works if they reach the upstream, so they are re-added here
+            lines = [f"{self.command} {self.path} HTTP/1.1",
+                     f"Host: {upstream.pool.host}:{upstream.pool.port}",
+                     "Connection: Upgrade",
+                     f"Upgrade: {self.headers['Upgrade']}"]
             for header, value in self.headers.items():
-                if header.lower() not in ['host']:
-                    req.add_header(header, value)
-
-            # Make request to React app
-            with urllib.request.urlopen(req) as response:
-                # Send response status
-                self.send_response(response.status)
-
-                # Copy response headers
-                for header, value in response.headers.items():
-                    if header.lower() not in ['server']:
-                        self.send_header(header, value)
+                if header.lower() not in REQUEST_SKIP_HEADERS:
+                    lines.append(f"{header}: {value}")
+            sock.sendall(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+
+            head, leftover = self.read_response_head(sock)
+            upstream.breaker.record(True)
+        except (OSError, ValueError) as e:
+            upstream.breaker.record(False)
+            if sock is not None:
+                sock.close()
+            self.send_error(502, f"Bad Gateway: {e}")
+            return
+        finally:
+            # A long-lived tunnel must not count as outstanding work for balancing
+            group.release(upstream)
+
+        status = head.split(b' ', 2)[1:2]
+        if status != [b'101']:
+            # Upgrade refused: relay the response by its own framing, since a
+            # keep-alive upstream will not close the connection after it
+            response = http.client.HTTPResponse(PrefetchedSocket(sock, head + leftover), method=self.command)
+            headers_sent = False
+            try:
+                response.begin()
+                headers_sent = True
+                self.relay_response(response)
+            except (OSError, http.client.HTTPException) as e:
+                self._fail(headers_sent, 502, f"Bad Gateway: {e}")
+            finally:
+                response.close()
+                sock.close()
+            return
+
+        self.wfile.write(head)
+        # Frames the client sent right after its handshake may already sit in
+        # rfile's buffer; collect them without blocking before handing off
+        self.connection.setblocking(False)
+        try:
+            client_pending = self.rfile.read1(CHUNK_SIZE) or b''
+        except OSError:
+            client_pending = b''
+        self.log_request(101)
+        self.response_status = 101
+        self.server.detach(self.connection)
+        self.server.tunnels.add(self.connection, sock, client_pending, leftover)
+
+    @staticmethod
+    def read_response_head(sock, limit=64 * 1024):
+        data = b''
+        while b'\r\n\r\n' not in data:
+            if len(data) > limit:
+                raise ValueError("upstream response head too large")
+            chunk = sock.recv(CHUNK_SIZE)
+            if not chunk:
+                raise ValueError("upstream closed the connection during the handshake")
+            data += chunk
+        head, _, leftover = data.partition(b'\r\n\r\n')
+        return head + b'\r\n\r\n', leftover
+
+    def open_upstream(self, pool, validators=None):
+        """Send the request upstream; validators replace every client conditional."""
+        skip_headers = REQUEST_SKIP_HEADERS
+        if validators is not None:
+            skip_headers = skip_headers | CONDITIONAL_HEADERS
+        extra_headers = validators or {}
+        body = self.request_body_reader = self.request_body()
+        while True:
+            conn, reused = pool.acquire()
+            try:
+                if not reused:
+                    connect_started = time.perf_counter()
+                    pool.connect(conn)
+                    self.timings['connect'] = time.perf_counter() - connect_started
+                conn.putrequest(self.command, self.path, skip_accept_encoding=True)
+
+                # Copy headers from original request
+                for header, value in self.headers.items():
+                    if header.lower() not in skip_headers:
+                        conn.putheader(header, value)
+                for header, value in extra_headers.items():
+                    conn.putheader(header, value)
+                if body is None:
+                    conn.endheaders()
+                elif body.length is None:
+                    conn.putheader('Transfer-Encoding', 'chunked')
+                    conn.endheaders(body, encode_chunked=True)
+                else:
+                    conn.putheader('Content-Length', str(body.length))
+                    conn.endheaders(body)
+                sent_at = time.perf_counter()
+                response = conn.getresponse()
+                self.timings['ttfb'] = time.perf_counter() - sent_at
+                return conn, response
+            except STALE_CONNECTION_ERRORS:
+                # The upstream dropped an idle connection; retry once fresh,
+                # unless part of a request body has already been consumed
+                pool.discard(conn, reconnect=reused)
+                if not reused or (body is not None and body.started):
+                    raise
+            except BaseException:
+                pool.discard(conn)
+                raise
+
+    def request_body(self):
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            return RequestBody(self.rfile, None)
+        length = self.headers.get('Content-Length')
+        if length is None:
+            return None
+        try:
+            length = int(length)
+        except ValueError:
+            raise RequestBodyError(f"invalid Content-Length {length!r}")
+        if length < 0:
+            raise RequestBodyError(f"invalid Content-Length {length!r}")
+        return RequestBody(self.rfile, length)
+
+    def send_metrics(self):
+        body = self.server.metrics.render(self.server).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def send_stats(self):
+        stats = {"pid": os.getpid(), "upstreams": self.server.router.stats()}
+        if self.server.cache is not None:
+            stats["cache"] = self.server.cache.stats()
+        if self.server.flights is not None:
+            stats["coalescing"] = self.server.flights.stats()
+        if self.server.compression is not None:
+            stats["compression"] = self.server.compression.stats()
+        if self.server.static is not None:
+            stats["static"] = self.server.static.stats()
+        if self.server.limiter is not None:
+            stats["rate_limit"] = self.server.limiter.stats()
+        if self.server.access_log is not None:
+            stats["access_log"] = self.server.access_log.stats()
+        stats["tunnels"] = self.server.tunnels.stats()
+        stats["rejected_connections"] = self.server.rejected
+        body = json.dumps(stats, indent=2).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def send_static(self, static_file):
+        """Answer from the static root; False if the file is gone and the request should be proxied."""
+        static = self.server.static
+        if self.not_modified_static(static_file):
+            self.send_response(304)
+            self.send_header('ETag', static_file.etag)
+            self.send_header('Last-Modified', static_file.last_modified)
+            self.send_header('Cache-Control', static_file.cache_control)
+            self.end_headers()
+            static.record(304, 0)
+            return True
+
+        # The headers describe the files as opened here, not as last indexed,
+        # so a rebuild between lookup and send cannot truncate the body
+        try:
+            original = open(static_file.path, 'rb')
+        except OSError:
+            return False
+        source = original
+        sibling = None
+        try:
+            stat = os.fstat(original.fileno())
+            if static_file.changed(stat):
+                static_file = static.refresh(static_file, stat)
+
+            status = 200
+            size = static_file.size
+            offset, count = 0, size
+            encoding = None
+            body = None
+            byte_range = None
+            compression = self.server.compression
+            compressible = compression is not None and static_file.compressible(compression)
+            if 'Range' in self.headers and self.if_range_matches(static_file):
+                byte_range = parse_range(self.headers['Range'], size)
+            if byte_range == 'unsatisfiable':
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
                 self.end_headers()
+                static.record(416, 0)
+                return True
+            if byte_range is not None:
+                status = 206
+                offset, count = byte_range[0], byte_range[1] - byte_range[0] + 1
+            elif static_file.precompressed:
+                encoding = negotiate_encoding(
+                    self.headers.get('Accept-Encoding'),
+                    [name for name in PRECOMPRESSED_SUFFIXES if name in static_file.precompressed],
+                )
+                if encoding is not None:
+                    try:
+                        sibling = open(static_file.precompressed[encoding][0], 'rb')
+                    except OSError:
+                        # Sibling removed since the last scan: send the original
+                        encoding = None
+                    else:
+                        source = sibling
+                        count = os.fstat(sibling.fileno()).st_size
+            elif compressible:
+                encoding = compression.negotiate(self.headers.get('Accept-Encoding'))
+                if encoding is not None:
+                    body = static_file.compressed_body(encoding, compression)
+                    if body is None:
+                        encoding = None
+                    else:
+                        count = len(body)
+                        compression.record(static_file.size, count)
 
-                # Send response body
-                self.wfile.write(response.read())
+            self.send_response(status)
+            self.send_header('Content-Type', static_file.content_type)
+            self.send_header('Content-Length', str(count))
+            self.send_header('Last-Modified', static_file.last_modified)
+            self.send_header('Cache-Control', static_file.cache_control)
+            self.send_header('Accept-Ranges', 'bytes')
+            if static_file.precompressed or compressible:
+                self.send_header('Vary', 'Accept-Encoding')
+            if encoding is not None:
+                self.send_header('Content-Encoding', encoding)
+                self.send_header('ETag', 'W/' + static_file.etag)
+            else:
+                self.send_header('ETag', static_file.etag)
+            if status == 206:
+                self.send_header('Content-Range', f'bytes {offset}-{offset + count - 1}/{static_file.size}')
+            self.end_headers()
 
-        except URLError as e:
-            self.send_error(502, f"Bad Gateway: {e}")
-        except Exception as e:
-            self.send_error(500, f"Internal Server Error: {e}")
+            if self.command != 'HEAD' and body is not None:
+                self.wfile.write(body)
+                static.record(status, count)
+            elif self.command != 'HEAD' and count:
+                # socket.sendfile uses os.sendfile, so the file's pages go straight
+                # from the page cache to the socket without a trip through Python
+                sent = self.connection.sendfile(source, offset, count)
+                self.timings['sendfile_bytes'] = sent
+                if sent != count:
+                    self.close_connection = True
+                static.record(status, sent)
+            else:
+                static.record(status, 0)
+            return True
+        finally:
+            original.close()
+            if sibling is not None:
+                sibling.close()
+
+    def not_modified_static(self, static_file):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag_matches(if_none_match, static_file.etag)
+        since = parse_http_date(self.headers.get('If-Modified-Since'))
+        return since is not None and static_file.mtime_ns // 1_000_000_000 <= since
+
+    def if_range_matches(self, static_file):
+        # A Range is only honoured if the client's copy is still current
+        if_range = self.headers.get('If-Range')
+        if if_range is None:
+            return True
+        if if_range.startswith('"') or if_range.startswith('W/'):
+            return if_range == static_file.etag
+        return if_range == static_file.last_modified
+
+    def send_cached(self, entry, cache_key=None):
+        encoding = None
+        compression = self.server.compression
+        if compression is not None:
+            encoding = compression.encoding_for(self.headers, entry.status, entry, len(entry.body))
+        headers = self.encoded_headers(entry.headers, encoding)
+
+        if entry.not_modified_for(self.headers):
+            self.send_response(304)
+            for header, value in headers:
+                if header.lower() in NOT_MODIFIED_HEADERS:
+                    self.send_header(header, value)
+            self.send_header('Age', str(entry.age()))
+            self.end_headers()
+            return
+
+        body = entry.body
+        if encoding is not None:
+            body = entry.variants.get(encoding)
+            if body is None and cache_key is not None and self.server.cache is not None:
+                # Cached bodies never change, so each encoding is produced
+                # once and kept next to the original
+                body = compression.compress_stored(entry.body, encoding)
+                self.server.cache.add_variant(cache_key, entry, encoding, body)
+            elif body is None:
+                # A coalesced response is answered to every waiting request at
+                # once; the first to need an encoding produces it for the rest
+                with entry.variants_lock:
+                    body = entry.variants.get(encoding)
+                    if body is None:
+                        body = entry.variants[encoding] = compression.compress_stored(
+                            entry.body, encoding, cached=False
+                        )
+            compression.record(len(entry.body), len(body))
+
+        self.send_response(entry.status)
+        for header, value in headers:
+            self.send_header(header, value)
+        self.send_header('Age', str(entry.age()))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    @staticmethod
+    def encoded_headers(headers, encoding):
+        if encoding is None:
+            return headers
+        encoded = []
+        vary = []
+        for header, value in headers:
+            name = header.lower()
+            if name == 'vary':
+                vary.extend(part.strip() for part in value.split(',') if part.strip())
+            elif name == 'etag' and not value.startswith('W/'):
+                # The encoded bytes differ from the original, so the entity
+                # tag may only claim weak equivalence
+                encoded.append((header, 'W/' + value))
+            elif name not in ('content-length', 'content-md5'):
+                encoded.append((header, value))
+        if 'accept-encoding' not in {name.lower() for name in vary}:
+            vary.append('Accept-Encoding')
+        encoded.append(('Content-Encoding', encoding))
+        encoded.append(('Vary', ', '.join(vary)))
+        return encoded
+
+    def relay_response(self, response, capture=None):
+        # A HEAD response carries the same headers as the GET would, encoding
+        # and framing included; only the body is left out
+        framed = response.status not in (204, 304)
+        has_body = framed and self.command != 'HEAD'
+        length = response.headers.get('Content-Length')
+
+        encoding = compressor = None
+        compression = self.server.compression
+        if framed and compression is not None:
+            known_length = int(length) if length is not None and length.isdigit() else None
+            encoding = compression.encoding_for(self.headers, response.status, response.headers, known_length)
+            if encoding is not None:
+                length = None
+                if has_body:
+                    compressor = compression.stream_compressor(encoding)
+
+        # Without a length the body has to be delimited some other way: chunked
+        # framing for HTTP/1.1 clients, connection close for HTTP/1.0 ones
+        chunked = framed and length is None and self.request_version == 'HTTP/1.1'
+        if has_body and length is None and not chunked:
+            self.close_connection = True
+
+        # Send response status
+        self.send_response(response.status)
+
+        # Copy response headers
+        headers = [
+            (header, value) for header, value in response.headers.items()
+            if header.lower() not in HOP_BY_HOP_HEADERS | {'server', 'date'}
+        ]
+        if encoding is not None:
+            headers = self.encoded_headers(headers, encoding)
+        for header, value in headers:
+            self.send_header(header, value)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+
+        if has_body:
+            self.stream_body(response, chunked, capture, compressor)
+
+    @staticmethod
+    def body_pieces(source, capture=None):
+        # read1 returns as soon as any data is available, so each piece is
+        # passed on as it arrives instead of after the whole body
+        while True:
+            data = source.read1(CHUNK_SIZE)
+            if not data:
+                break
+            if capture is not None:
+                capture.add(data)
+                if capture.wants_read_ahead():
+                    # Hold the pieces back until the upstream is done or the
+                    # capture gives up, then write them out
+                    pending = [data]
+                    while not capture.overflowed:
+                        data = source.read1(CHUNK_SIZE)
+                        if not data:
+                            capture.complete()
+                            capture = None
+                            break
+                        capture.add(data)
+                        pending.append(data)
+                    yield from pending
+                    if capture is None:
+                        return
+                    continue
+            yield data
+        if capture is not None:
+            capture.complete()
+
+    def stream_body(self, source, chunked, capture=None, compressor=None):
+        bytes_in = bytes_out = 0
+        for data in self.body_pieces(source, capture):
+            if compressor is not None:
+                bytes_in += len(data)
+                data = compressor.compress(data)
+                bytes_out += len(data)
+            self.write_piece(data, chunked)
+        if compressor is not None:
+            data = compressor.finish()
+            bytes_out += len(data)
+            self.write_piece(data, chunked)
+            self.server.compression.record(bytes_in, bytes_out)
+        if chunked:
+            self.wfile.write(b"0\r\n\r\n")
+
+    def write_piece(self, data, chunked):
+        if not data:
+            # An empty chunk would terminate a chunked body early
+            return
+        if chunked:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        else:
+            self.wfile.write(data)
+
+    def _fail(self, headers_sent, code, message):
+        if headers_sent:
+            # The status line is already out; all we can do is drop the
+            # connection so the client sees a truncated response
+            self.close_connection = True
+            self.log_error("%s", message)
+        else:
+            self.send_error(code, message)
+
+class ProxyServer(http.server.HTTPServer):
+    """HTTP server whose connections can be detached from request handling.
+
+    Upgraded connections outlive their handler; detaching one stops the
+    server from shutting it down when the handler returns. Connections are
+    handled one at a time, so each is closed after its response.
+    """
+
+    keep_alive = False
+
+    def __init__(self, server_address, handler_class, reuse_port=False, backlog=128):
+        self.reuse_port = reuse_port
+        self.draining = False
+        self.rejected = 0
+        # Connections the kernel queues before accept(); beyond this clients are
+        # refused at the TCP level instead of piling up unseen
+        self.request_queue_size = backlog
+        self.client_timeout = None
+        self.keep_alive_timeout = None
+        self.client_write_timeout = None
+        super().__init__(server_address, handler_class)
+        self._detached = set()
+        self._detached_lock = threading.Lock()
+        # Insertion-ordered, so the longest idle connection comes first
+        self._idle = {}
+        self._idle_lock = threading.Lock()
+        self.tunnels = TunnelHub()
+        self.tunnels.start()
+
+    def server_bind(self):
+        if self.reuse_port:
+            # Every pre-forked worker binds its own socket to the same port and
+            # the kernel spreads incoming connections across them
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def drain(self, timeout):
+        """Wait up to timeout seconds for in-flight requests; True if all finished."""
+        return True
+
+    def connection_idle(self, connection, idle):
+        """Track connections waiting for their next request.
+
+        Returns False when the server is draining, in which case the
+        connection should be closed rather than wait.
+        """
+        with self._idle_lock:
+            if not idle:
+                self._idle.pop(connection, None)
+                return True
+            if self.draining:
+                return False
+            self._idle[connection] = None
+            return True
+
+    def close_idle(self, limit=None):
+        """Close up to limit idle connections, longest idle first; all by default."""
+        # Shutting down the read side wakes a handler blocked waiting for the
+        # next request with EOF, so it finishes instead of holding its slot
+        # until the keep-alive timeout
+        with self._idle_lock:
+            connections = list(self._idle)[:limit]
+            for connection in connections:
+                del self._idle[connection]
+                try:
+                    connection.shutdown(socket.SHUT_RD)
+                except OSError:
+                    pass
+
+    def detach(self, request):
+        with self._detached_lock:
+            self._detached.add(request)
+
+    def shutdown_request(self, request):
+        with self._detached_lock:
+            if request in self._detached:
+                self._detached.discard(request)
+                return
+        super().shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.tunnels.stop()
+
+class PooledProxyServer(ProxyServer):
+    """HTTP server that hands each connection to a bounded worker pool.
+
+    Up to max_queue connections wait for a free worker; past that the server
+    is saturated and new connections get an immediate 503.
+    """
+
+    keep_alive = True
+
+    def __init__(self, server_address, handler_class, max_connections=64, max_queue=64,
+                 reuse_port=False, backlog=128):
+        super().__init__(server_address, handler_class, reuse_port=reuse_port, backlog=backlog)
+        self.max_connections = max_connections
+        self.max_queue = max_queue
+        self._capacity = max_connections + max_queue
+        self._slots = threading.BoundedSemaphore(self._capacity)
+        # Connections handed to the executor and not yet finished
+        self._assigned = 0
+        self._assigned_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_connections, thread_name_prefix="proxy-worker"
+        )
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            self.reject(request)
+            return
+        with self._assigned_lock:
+            queued = self._assigned >= self.max_connections
+            self._assigned += 1
+        if queued:
+            # Every worker is busy; a worker merely waiting on an idle
+            # keep-alive connection is better spent on this one
+            self.close_idle(1)
+        try:
+            self._executor.submit(self._process_in_worker, request, client_address)
+        except RuntimeError:
+            with self._assigned_lock:
+                self._assigned -= 1
+            self._slots.release()
+            self.shutdown_request(request)
+
+    def reject(self, request):
+        # Runs on the accept loop, so nothing here may block
+        self.rejected += 1
+        try:
+            request.setblocking(False)
+            try:
+                # Consume whatever request bytes already arrived so closing
+                # does not reset the connection before the client reads the 503
+                request.recv(CHUNK_SIZE)
+            except BlockingIOError:
+                pass
+            request.send(SATURATED_RESPONSE)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _process_in_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._assigned_lock:
+                self._assigned -= 1
+            self._slots.release()
+
+    def drain(self, timeout):
+        # Idle keep-alive connections are closed now; only requests actually
+        # in progress are waited for. Holding every slot means no worker is
+        # still handling a connection
+        self.close_idle()
+        deadline = time.monotonic() + timeout
+        acquired = 0
+        try:
+            while acquired < self._capacity:
+                if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                    return False
+                acquired += 1
+            return True
+        finally:
+            for _ in range(acquired):
+                self._slots.release()
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False)
+
+def build_server(args, reuse_port=False):
+    address = (args.host, args.port)
+    if args.concurrency == "single":
+        server = ProxyServer(address, ProxyHandler, reuse_port=reuse_port, backlog=args.backlog)
+    else:
+        server = PooledProxyServer(
+            address, ProxyHandler, max_connections=args.max_connections,
+            max_queue=args.max_queue, reuse_port=reuse_port, backlog=args.backlog,
+        )
+    server.client_timeout = args.client_timeout
+    server.keep_alive_timeout = args.keep_alive_timeout
+    server.access_log = None
+    if args.access_log:
+        server.access_log = AccessLog(
+            args.access_log, int(args.access_log_max_size * 1024 * 1024),
+            args.access_log_backups, args.access_log_buffer,
+        )
+        server.access_log.start()
+    server.limiter = None
+    server.rate_limit_by = args.rate_limit_by
+    budgets = {
+        name: (rate, burst)
+        for name, rate, burst in (('api', args.api_rate, args.api_burst),
+                                  ('static', args.static_rate, args.static_burst))
+        if rate > 0
+    }
+    if budgets:
+        server.limiter = RateLimiter(budgets)
+    server.client_write_timeout = args.client_write_timeout
+    server.router = build_router(args)
+    server.metrics = Metrics()
+    server.cache = None
+    if args.cache_size > 0:
+        server.cache = ResponseCache(
+            int(args.cache_size * 1024 * 1024), int(args.cache_max_entry * 1024 * 1024)
+        )
+    server.static = None
+    if args.static_root:
+        server.static = StaticIndex(
+            args.static_root, spa_fallback=args.spa_fallback,
+            exclude_prefixes=args.api_prefix or DEFAULT_API_PREFIXES,
+        )
+    server.compression = None
+    if args.compress:
+        server.compression = Compression(args.compress_min_size, args.compress_level)
+    server.flights = None
+    if args.coalesce:
+        server.flights = SingleFlight(
+            int(args.coalesce_max_body * 1024 * 1024), args.coalesce_timeout
+        )
+    return server
+
+def build_router(args):
+    def group(name, urls, health_path):
+        upstreams = [
+            Upstream(url, args.pool_size, args.pool_idle_timeout,
+                     breaker=CircuitBreaker(args.breaker_threshold, args.breaker_reset),
+                     connect_timeout=args.connect_timeout, read_timeout=args.read_timeout)
+            for url in urls
+        ]
+        return UpstreamGroup(name, upstreams, balance=args.balance, health_path=health_path)
+
+    frontend = group("frontend", args.frontend or [DEFAULT_UPSTREAM], args.frontend_health_path)
+    if not args.backend:
+        return Router([], frontend)
+    backend = group("backend", args.backend, args.backend_health_path)
+    prefixes = args.api_prefix or DEFAULT_API_PREFIXES
+    return Router([(prefix, backend) for prefix in prefixes], frontend)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Development proxy for the Florida First Roofing app")
+    parser.add_argument("--host", default="", help="Interface to listen on (default: all)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on")
+    parser.add_argument("--concurrency", choices=["single", "threaded"], default="threaded",
+                        help="Serve one request at a time or use a bounded worker pool")
+    parser.add_argument("--max-connections", type=int, default=64,
+                        help="Maximum connections handled concurrently in threaded mode")
+    parser.add_argument("--max-queue", type=int, default=64,
+                        help="Connections allowed to wait for a busy worker before new ones "
+                             "are answered with 503")
+    parser.add_argument("--backlog", type=int, default=128,
+                        help="Listen backlog of connections not yet accepted")
+    parser.add_argument("--connect-timeout", type=float, default=5.0,
+                        help="Seconds to wait for a new upstream connection")
+    parser.add_argument("--read-timeout", type=float, default=60.0,
+                        help="Seconds an upstream may go silent before the request fails with 504")
+    parser.add_argument("--client-timeout", type=float, default=30.0,
+                        help="Seconds a client may stall while sending a request")
+    parser.add_argument("--keep-alive-timeout", type=float, default=5.0,
+                        help="Seconds a client connection may sit idle waiting for its next request")
+    parser.add_argument("--client-write-timeout", type=float, default=30.0,
+                        help="Seconds a client may stop reading a response before it is dropped")
+    parser.add_argument("--frontend", action="append", metavar="URL",
+                        help=f"Frontend upstream; repeat to balance across several (default: {DEFAULT_UPSTREAM})")
+    parser.add_argument("--backend", action="append", metavar="URL",
+                        help="Backend API upstream, e.g. http://localhost:5001; repeat for each worker")
+    parser.add_argument("--api-prefix", action="append", metavar="PREFIX",
+                        help="Path prefix routed to the backends; repeatable "
+                             f"(default: {' '.join(DEFAULT_API_PREFIXES)})")
+    parser.add_argument("--balance", choices=BALANCE_STRATEGIES, default="round-robin",
+                        help="How requests are spread across the upstreams of a group")
+    parser.add_argument("--frontend-health-path", default="/",
+                        help="Path probed on frontend upstreams by the health checker")
+    parser.add_argument("--backend-health-path", default="/health",
+                        help="Path probed on backend upstreams by the health checker")
+    parser.add_argument("--health-interval", type=float, default=5.0,
+                        help="Seconds between health probes; 0 disables active checks")
+    parser.add_argument("--health-timeout", type=float, default=2.0,
+                        help="Seconds before a health probe counts as failed")
+    parser.add_argument("--breaker-threshold", type=int, default=3,
+                        help="Consecutive failures that open an upstream's circuit")
+    parser.add_argument("--breaker-reset", type=float, default=10.0,
+                        help="Seconds an open circuit waits before letting a trial request through")
+    parser.add_argument("--api-rate", type=float, default=0, metavar="PER_SECOND",
+                        help="Sustained requests per second each client may send to the backends; "
+                             "0 disables limiting. Limits are kept per worker process, so with "
+                             "--workers N a client may get up to N times this rate and burst")
+    parser.add_argument("--api-burst", type=int, default=20,
+                        help="Requests a client may send to the backends in a burst")
+    parser.add_argument("--static-rate", type=float, default=0, metavar="PER_SECOND",
+                        help="Sustained requests per second each client may make for frontend "
+                             "and static assets; 0 disables limiting. Per worker process, like "
+                             "--api-rate")
+    parser.add_argument("--static-burst", type=int, default=200,
+                        help="Frontend and static asset requests a client may make in a burst")
+    parser.add_argument("--rate-limit-by", choices=["ip", "auth"], default="ip",
+                        help="Key rate limits by client IP, or by Authorization header when present")
+    parser.add_argument("--pool-size", type=int, default=16,
+                        help="Idle keep-alive connections kept per upstream")
+    parser.add_argument("--pool-idle-timeout", type=float, default=4.0,
+                        help="Seconds an idle upstream connection is kept; stay below the "
+                             "upstream's keep-alive timeout (5s for Node)")
+    parser.add_argument("--cache-size", type=float, default=0, metavar="MB",
+                        help="Memory budget for the response cache; 0 disables caching")
+    parser.add_argument("--cache-max-entry", type=float, default=4, metavar="MB",
+                        help="Largest single response body the cache will keep")
+    parser.add_argument("--coalesce", action="store_true",
+                        help="Share one upstream fetch between concurrent identical GETs")
+    parser.add_argument("--coalesce-max-body", type=float, default=8, metavar="MB",
+                        help="Largest response body held in memory for waiting requests")
+    parser.add_argument("--coalesce-timeout", type=float, default=30.0,
+                        help="Seconds a coalesced request waits before fetching on its own")
+    parser.add_argument("--compress", action="store_true",
+                        help="Compress text responses with brotli or gzip when the client accepts it")
+    parser.add_argument("--compress-min-size", type=int, default=1024, metavar="BYTES",
+                        help="Responses smaller than this are sent uncompressed")
+    parser.add_argument("--compress-level", type=int, default=6, choices=range(1, 10), metavar="1-9",
+                        help="gzip level for responses compressed while streaming")
+    parser.add_argument("--static-root", metavar="DIR",
+                        help="Serve files from this directory (e.g. build/) directly; other paths are proxied. "
+                             "With --compress, text files without .br/.gz siblings are compressed "
+                             "once per version")
+    parser.add_argument("--spa-fallback", action="store_true",
+                        help="Answer extensionless paths missing from --static-root with its index.html")
+    parser.add_argument("--access-log", metavar="PATH",
+                        help="Write JSON-lines access logs here ('-' for stdout) instead of the "
+                             "console request log")
+    parser.add_argument("--access-log-max-size", type=float, default=10, metavar="MB",
+                        help="Rotate the access log when it grows past this size; 0 never rotates")
+    parser.add_argument("--access-log-backups", type=int, default=5,
+                        help="Rotated access log files to keep")
+    parser.add_argument("--access-log-buffer", type=int, default=10000, metavar="RECORDS",
+                        help="Records queued for the log writer before new ones are dropped")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Pre-forked worker processes sharing the port; 0 means one per CPU")
+    parser.add_argument("--drain-timeout", type=float, default=10.0,
+                        help="Seconds to let in-flight requests finish on shutdown")
+    args = parser.parse_args(argv)
+    if args.workers < 0:
+        parser.error("--workers must not be negative")
+    if args.workers == 0:
+        args.workers = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    if args.workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        parser.error("--workers needs SO_REUSEPORT, which this platform does not provide")
+    if args.max_connections < 1:
+        parser.error("--max-connections must be at least 1")
+    if args.max_queue < 0:
+        parser.error("--max-queue must not be negative")
+    if args.backlog < 1:
+        parser.error("--backlog must be at least 1")
+    for name in ("connect_timeout", "read_timeout", "client_timeout", "client_write_timeout",
+                 "keep_alive_timeout"):
+        if getattr(args, name) <= 0:
+            parser.error(f"--{name.replace('_', '-')} must be positive")
+    if args.api_rate < 0 or args.static_rate < 0:
+        parser.error("--api-rate and --static-rate must not be negative")
+    if args.api_burst < 1 or args.static_burst < 1:
+        parser.error("--api-burst and --static-burst must be at least 1")
+    if args.access_log_backups < 0 or args.access_log_buffer < 1:
+        parser.error("--access-log-backups must not be negative and --access-log-buffer must be positive")
+    if args.pool_size < 0:
+        parser.error("--pool-size must not be negative")
+    if args.breaker_threshold < 1:
+        parser.error("--breaker-threshold must be at least 1")
+    if args.static_root and not os.path.isdir(args.static_root):
+        parser.error(f"--static-root is not a directory: {args.static_root}")
+    if args.spa_fallback and not args.static_root:
+        parser.error("--spa-fallback requires --static-root")
+    for url in (args.frontend or []) + (args.backend or []):
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme != "http" or not parsed.hostname:
+            parser.error(f"upstream must be an http://host[:port] URL: {url}")
+    for prefix in args.api_prefix or []:
+        if not prefix.startswith('/'):
+            parser.error(f"--api-prefix must start with '/': {prefix}")
+    return args
+
+def serve(args, reuse_port=False, announce=True):
+    """Run one proxy server until SIGTERM/SIGINT, then drain in-flight requests.
+
+    Returns False if requests were still in flight when the drain timed out.
+    """
+    with build_server(args, reuse_port) as httpd:
+        if announce:
+            print(f"Proxy server running on port {args.port}")
+            if args.concurrency == "threaded":
+                print(f"Handling up to {args.max_connections} connections concurrently, "
+                      f"queueing {args.max_queue} more")
+            for prefix, group in httpd.router.routes:
+                print(f"Routing {prefix} to {', '.join(u.url for u in group.upstreams)} ({group.balance})")
+            frontend = httpd.router.default
+            print(f"Forwarding everything else to {', '.join(u.url for u in frontend.upstreams)}")
+            if httpd.cache is not None:
+                print(f"Caching responses in up to {args.cache_size:g} MB of memory")
+            if httpd.flights is not None:
+                print("Coalescing concurrent identical GET requests")
+            if httpd.static is not None:
+                print(f"Serving {httpd.static.stats()['files']} files from {httpd.static.root}")
+            if httpd.compression is not None:
+                print(f"Compressing responses with {', '.join(httpd.compression.encodings)}")
+            if httpd.access_log is not None:
+                print(f"Writing JSON access log to {args.access_log}")
+            if httpd.limiter is not None:
+                for name, (rate, burst) in httpd.limiter.budgets.items():
+                    print(f"Limiting each client ({args.rate_limit_by}) to {rate:g} {name} "
+                          f"requests/s, bursts of {burst}")
+            print(f"Upstream statistics at http://localhost:{args.port}/__proxy/stats (local clients only)")
+            print(f"Prometheus metrics at http://localhost:{args.port}/__proxy/metrics (local clients only)")
+
+        def stop(signum, frame):
+            # shutdown() waits for serve_forever to return, so it cannot be
+            # called from the thread that is running it
+            httpd.draining = True
+            threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, stop)
+        health_checker = None
+        if args.health_interval > 0:
+            health_checker = HealthChecker(httpd.router, args.health_interval, args.health_timeout)
+            health_checker.start()
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            httpd.draining = True
+        finally:
+            if health_checker is not None:
+                health_checker.stop()
+            # Stop accepting before waiting, so new connections go to the
+            # other workers while this one finishes what it has
+            httpd.socket.close()
+            drained = httpd.drain(args.drain_timeout)
+            if not drained:
+                print(f"Worker {os.getpid()}: drain timed out with requests in flight", file=sys.stderr)
+            httpd.router.close()
+            if httpd.access_log is not None:
+                httpd.access_log.stop()
+    return drained
+
+class WorkerSupervisor:
+    """Pre-forks proxy workers that share the port via SO_REUSEPORT.
+
+    Crashed workers are replaced; SIGTERM/SIGINT are forwarded to every
+    worker so each drains its in-flight requests, and stragglers are killed
+    once the drain timeout (plus a little grace) has passed.
+    """
+
+    # A worker that dies sooner than this after starting counts as a failed start
+    MIN_UPTIME = 1.0
+    MAX_FAILED_STARTS = 5
+
+    def __init__(self, args, workers):
+        self.args = args
+        self.workers = workers
+        self.children = {}  # pid -> started_at
+        self.stopping = False
+        self.kill_deadline = None
+        self.failed_starts = 0
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            # Only the supervisor reacts to Ctrl+C; it stops workers with SIGTERM
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                if not serve(self.args, reuse_port=True, announce=False):
+                    code = 1
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                # Skip interpreter teardown, which would wait on worker threads
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+
+    def stop(self, signum, frame):
+        if not self.stopping:
+            self.stopping = True
+            self.kill_deadline = time.monotonic() + self.args.drain_timeout + 5
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"Supervising {self.workers} workers on port {self.args.port}: "
+              f"{', '.join(str(pid) for pid in self.children)}")
+        if self.args.api_rate > 0 or self.args.static_rate > 0:
+            # Each worker keeps its own token buckets, and a client's
+            # connections may land on any of them
+            print(f"Rate limits apply per worker: a client may get up to {self.workers} times "
+                  "the configured rate and burst", file=sys.stderr)
+
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                if self.stopping and time.monotonic() > self.kill_deadline:
+                    for child in self.children:
+                        os.kill(child, signal.SIGKILL)
+                time.sleep(0.1)
+                continue
+            started_at = self.children.pop(pid, None)
+            if started_at is None or self.stopping:
+                continue
 
-    def do_POST(self):
-        # Same logic for POST requests
-        self.do_GET()
+            print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting",
+                  file=sys.stderr)
+            if time.monotonic() - started_at < self.MIN_UPTIME:
+                self.failed_starts += 1
+                if self.failed_starts >= self.MAX_FAILED_STARTS:
+                    print("Workers keep failing on startup; giving up", file=sys.stderr)
+                    self.stop(signal.SIGTERM, None)
+                    continue
+                time.sleep(self.MIN_UPTIME)
+            else:
+                self.failed_starts = 0
+            self.spawn()
+        return 1 if self.failed_starts >= self.MAX_FAILED_STARTS else 0
 
 if __name__ == "__main__":
-    PORT = 8000
-    with socketserver.TCPServer(("", PORT), ProxyHandler) as httpd:
-        print(f"Proxy server running on port {PORT}")
-        print(f"Forwarding to React app on localhost:3000")
-        httpd.serve_forever()
\ No newline at end of file
+    args = parse_args()
+    if args.workers == 1:
+        if not serve(args):
+            # Don't let interpreter shutdown wait on the stuck worker threads
+            os._exit(1)
+    else:
+        sys.exit(WorkerSupervisor(args, args.workers).run())
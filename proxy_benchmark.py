@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""Load-test proxy.py against a local stub upstream.
+
+Starts a stub upstream that serves fixed-size payloads after an optional
+delay, starts a fresh proxy.py in front of it for every scenario, drives it
+with concurrent keep-alive clients and reports requests/sec, latency
+percentiles and the proxy's peak RSS. Everything runs on 127.0.0.1, so no
+network access is needed.
+
+    python3 proxy_benchmark.py --clients 32 --payload-size 1024 --payload-size 1048576
+    python3 proxy_benchmark.py --proxy-args "--workers 4" --compare previous.json
+"""
+import argparse
+import http.client
+import http.server
+import json
+import multiprocessing
+import os
+import platform
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+PROXY_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "proxy.py")
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Answers GET /bytes/<size>?delay=<ms> with size bytes after delay ms."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK and every response takes ~40ms
+    disable_nagle_algorithm = True
+    payloads = {}
+
+    def do_GET(self):
+        parsed = urllib.parse.urlsplit(self.path)
+        parts = parsed.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'bytes' or not parts[1].isdigit():
+            self.send_error(404)
+            return
+        delay = urllib.parse.parse_qs(parsed.query).get('delay', ['0'])[0]
+        if float(delay) > 0:
+            time.sleep(float(delay) / 1000)
+        size = int(parts[1])
+        body = self.payloads.get(size)
+        if body is None:
+            body = self.payloads[size] = os.urandom(size)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(size))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def run_stub(port):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    server.serve_forever()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"nothing listening on port {port} after {timeout:g}s")
+
+def process_tree(pid):
+    """pid and all of its descendants, read from /proc."""
+    pids = [pid]
+    for current in pids:
+        try:
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return pids
+
+def peak_rss_kb(pid):
+    """Sum of VmHWM (peak resident set size) over a process and its children."""
+    total = 0
+    for current in process_tree(pid):
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        total += int(line.split()[1])
+        except OSError:
+            pass
+    return total
+
+def client_worker(port, path, connections, warmup_until, stop_at, results):
+    """Run keep-alive clients on threads; send back latencies of requests after warmup."""
+    latencies = []
+    counts = {"errors": 0, "bytes": 0}
+    lock = threading.Lock()
+
+    def client():
+        own = []
+        errors = received = 0
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while True:
+            started = time.perf_counter()
+            if started >= stop_at:
+                break
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                body = response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                ok = False
+                body = b''
+            finished = time.perf_counter()
+            if started < warmup_until:
+                continue
+            if ok:
+                own.append(finished - started)
+                received += len(body)
+            else:
+                errors += 1
+        conn.close()
+        with lock:
+            latencies.extend(own)
+            counts["errors"] += errors
+            counts["bytes"] += received
+
+    threads = [threading.Thread(target=client) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put((latencies, counts))
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def drive(port, path, clients, processes, warmup, duration):
+    """Load port with clients spread over processes; returns the measured results."""
+    # Client threads in one process would share a GIL and measure themselves,
+    # so the load is spread across processes
+    processes = max(1, min(processes, clients))
+    warmup_until = time.perf_counter() + warmup
+    stop_at = warmup_until + duration
+    results = multiprocessing.Queue()
+    workers = []
+    for index in range(processes):
+        connections = clients // processes + (1 if index < clients % processes else 0)
+        worker = multiprocessing.Process(
+            target=client_worker, args=(port, path, connections, warmup_until, stop_at, results)
+        )
+        worker.start()
+        workers.append(worker)
+    latencies = []
+    errors = received = 0
+    for _ in workers:
+        worker_latencies, counts = results.get()
+        latencies.extend(worker_latencies)
+        errors += counts["errors"]
+        received += counts["bytes"]
+    for worker in workers:
+        worker.join()
+
+    latencies.sort()
+    to_ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / duration, 1),
+        "throughput_mb_per_second": round(received / duration / (1024 * 1024), 2),
+        "latency_ms": {
+            "p50": to_ms(percentile(latencies, 0.50)),
+            "p95": to_ms(percentile(latencies, 0.95)),
+            "p99": to_ms(percentile(latencies, 0.99)),
+            "mean": to_ms(sum(latencies) / len(latencies)) if latencies else None,
+            "max": to_ms(latencies[-1] if latencies else None),
+        },
+    }
+
+def run_scenario(args, stub_port, payload_size, direct=False):
+    path = f"/bytes/{payload_size}?delay={args.latency:g}"
+    scenario = {
+        "target": "direct" if direct else "proxy",
+        "payload_size": payload_size,
+        "upstream_latency_ms": args.latency,
+        "clients": args.clients,
+    }
+    if direct:
+        scenario.update(drive(stub_port, path, args.clients, args.client_processes,
+                              args.warmup, args.duration))
+        return scenario
+
+    # A fresh proxy per scenario, so its peak RSS belongs to this scenario alone
+    proxy_port = free_port()
+    command = [sys.executable, PROXY_SCRIPT, "--host", "127.0.0.1", "--port", str(proxy_port),
+               "--frontend", f"http://127.0.0.1:{stub_port}", "--health-interval", "0"]
+    command += shlex.split(args.proxy_args)
+    proxy = subprocess.Popen(command, stdout=subprocess.DEVNULL,
+                             stderr=None if args.verbose else subprocess.DEVNULL)
+    try:
+        wait_for_port(proxy_port)
+        scenario.update(drive(proxy_port, path, args.clients, args.client_processes,
+                              args.warmup, args.duration))
+        scenario["proxy_peak_rss_kb"] = peak_rss_kb(proxy.pid)
+    finally:
+        proxy.send_signal(signal.SIGTERM)
+        try:
+            proxy.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proxy.kill()
+            proxy.wait()
+    return scenario
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(PROXY_SCRIPT),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def scenario_key(result):
+    return (result["target"], result["payload_size"], result["upstream_latency_ms"], result["clients"])
+
+def print_result(result, previous=None):
+    latency = result["latency_ms"]
+    line = (f"{result['target']:6} {result['payload_size']:>9} B  "
+            f"{result['requests_per_second']:>9.1f} req/s  "
+            f"p50 {latency['p50']}ms  p95 {latency['p95']}ms  p99 {latency['p99']}ms  "
+            f"errors {result['errors']}")
+    if "proxy_peak_rss_kb" in result:
+        line += f"  peak RSS {result['proxy_peak_rss_kb'] / 1024:.1f} MB"
+    if previous and previous.get("requests_per_second"):
+        change = result["requests_per_second"] / previous["requests_per_second"] - 1
+        line += f"  ({change:+.1%} req/s vs previous)"
+    print(line)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark proxy.py against a local stub upstream")
+    parser.add_argument("--clients", type=int, default=16,
+                        help="Concurrent keep-alive client connections")
+    parser.add_argument("--client-processes", type=int, default=os.cpu_count() or 1,
+                        help="Processes the client connections are spread across")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds measured per scenario, after the warmup")
+    parser.add_argument("--warmup", type=float, default=2.0,
+                        help="Seconds of load before measuring starts")
+    parser.add_argument("--payload-size", type=int, action="append", metavar="BYTES",
+                        help="Response body size served by the stub; repeat for several "
+                             "scenarios (default: 1024 and 102400)")
+    parser.add_argument("--latency", type=float, default=0, metavar="MS",
+                        help="Delay the stub upstream adds before answering")
+    parser.add_argument("--proxy-args", default="",
+                        help="Extra proxy.py options, e.g. \"--workers 4 --cache-size 64\"")
+    parser.add_argument("--direct", action="store_true",
+                        help="Also measure the stub without the proxy, as a baseline")
+    parser.add_argument("--output", metavar="PATH",
+                        help="Where to save the JSON results (default: proxy-benchmark-<time>.json)")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="Earlier results file to compare requests/sec against")
+    parser.add_argument("--verbose", action="store_true", help="Show the proxy's own output")
+    args = parser.parse_args(argv)
+    if args.clients < 1 or args.client_processes < 1:
+        parser.error("--clients and --client-processes must be at least 1")
+    if args.duration <= 0 or args.warmup < 0:
+        parser.error("--duration must be positive and --warmup not negative")
+    args.payload_size = args.payload_size or [1024, 102400]
+    if any(size < 0 for size in args.payload_size):
+        parser.error("--payload-size must not be negative")
+    if not sys.platform.startswith("linux"):
+        parser.error("peak RSS is read from /proc, so the benchmark needs Linux")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = {scenario_key(result): result for result in json.load(f)["results"]}
+
+    stub_port = free_port()
+    stub = multiprocessing.Process(target=run_stub, args=(stub_port,), daemon=True)
+    stub.start()
+    results = []
+    try:
+        wait_for_port(stub_port)
+        for payload_size in args.payload_size:
+            targets = [True, False] if args.direct else [False]
+            for direct in targets:
+                result = run_scenario(args, stub_port, payload_size, direct=direct)
+                print_result(result, previous.get(scenario_key(result)))
+                results.append(result)
+    finally:
+        stub.terminate()
+        stub.join()
+
+    report = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": git_commit(),
+        "host": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "clients": args.clients,
+            "client_processes": args.client_processes,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "proxy_args": args.proxy_args,
+        },
+        "results": results,
+    }
+    output = args.output or time.strftime("proxy-benchmark-%Y%m%dT%H%M%SZ.json", time.gmtime())
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"Results saved to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Regression tests for proxy.py, run against a local upstream on 127.0.0.1.
+
+    python -m pytest tests/test_proxy.py
+"""
+import http.client
+import http.server
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import proxy  # noqa: E402
+from proxy_benchmark import free_port, wait_for_port  # noqa: E402
+
+BODY = bytes(range(256)) * 40
+
+class SlowUpstream(http.server.BaseHTTPRequestHandler):
+    """Serves BODY after a short delay, honouring a single byte Range."""
+
+    protocol_version = "HTTP/1.1"
+    delay = 0.5
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        byte_range = proxy.parse_range(self.headers.get('Range'), len(BODY))
+        if isinstance(byte_range, tuple):
+            start, end = byte_range
+            body = BODY[start:end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(BODY)}')
+        else:
+            body = BODY
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def upstream():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), SlowUpstream)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def start_proxy(upstream_url, *extra_args):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'proxy.py'), '--host', '127.0.0.1', '--port', str(port),
+         '--frontend', upstream_url, '--health-interval', '0', *extra_args],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    wait_for_port(port)
+    return process, port
+
+def fetch(port, path, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    try:
+        conn.request('GET', path, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+def test_range_requests_are_not_coalesced():
+    assert proxy.SingleFlight.request_is_coalescable('GET', {})
+    for name in ('Range', 'If-Range', 'If-Match', 'If-Unmodified-Since'):
+        assert not proxy.SingleFlight.request_is_coalescable('GET', {name: 'x'})
+    assert not proxy.SingleFlight.request_is_coalescable('HEAD', {})
+
+def test_plain_get_does_not_receive_a_concurrent_partial_response(upstream):
+    process, port = start_proxy(upstream, '--coalesce')
+    try:
+        results = {}
+
+        def partial():
+            results['partial'] = fetch(port, '/slow1', {'Range': 'bytes=0-9'})
+
+        leader = threading.Thread(target=partial)
+        leader.start()
+        time.sleep(0.1)
+        results['full'] = fetch(port, '/slow1')
+        leader.join()
+    finally:
+        process.terminate()
+        process.wait()
+
+    status, headers, body = results['partial']
+    assert status == 206 and body == BODY[:10]
+    status, headers, body = results['full']
+    assert status == 200
+    assert 'Content-Range' not in headers
+    assert body == BODY
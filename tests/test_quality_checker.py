@@ -0,0 +1,86 @@
+"""Tests for the TS/TSX tokenizer and import parser in quality_checker.py.
+
+    python -m pytest tests/test_quality_checker.py
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'archive', 'artifacts', 'skills'))
+
+from quality_checker import identifier_index, tokenize  # noqa: E402
+
+def bindings(source):
+    found, _ = identifier_index(source)
+    return [(b.local, b.imported, b.kind, b.type_only) for b in found]
+
+def unused(source):
+    found, used = identifier_index(source)
+    return sorted(b.local for b in found if b.local not in used)
+
+def test_default_import():
+    assert bindings("import React from 'react';") == [('React', 'default', 'default', False)]
+
+def test_named_and_aliased_imports():
+    assert bindings("import { useState, Foo as Bar } from 'react';") == [
+        ('useState', 'useState', 'named', False),
+        ('Bar', 'Foo', 'named', False),
+    ]
+
+def test_namespace_import():
+    assert bindings("import * as api from './api';") == [('api', '*', 'namespace', False)]
+
+def test_default_with_named_and_namespace():
+    assert bindings("import a, { b } from 'x';\nimport c, * as d from 'y';") == [
+        ('a', 'default', 'default', False),
+        ('b', 'b', 'named', False),
+        ('c', 'default', 'default', False),
+        ('d', '*', 'namespace', False),
+    ]
+
+def test_type_only_imports():
+    assert bindings("import type { Props } from './types';\nimport type Theme from './theme';") == [
+        ('Props', 'Props', 'named', True),
+        ('Theme', 'default', 'default', True),
+    ]
+
+def test_inline_type_specifier():
+    assert bindings("import { type FC, useMemo, type Ref as R } from 'react';") == [
+        ('FC', 'FC', 'named', True),
+        ('useMemo', 'useMemo', 'named', False),
+        ('R', 'Ref', 'named', True),
+    ]
+
+def test_multi_line_import():
+    source = "import {\n  Alpha,\n  Beta as B, // trailing comment\n} from './letters';\n"
+    assert bindings(source) == [('Alpha', 'Alpha', 'named', False), ('B', 'Beta', 'named', False)]
+
+def test_side_effect_and_dynamic_imports_bind_nothing():
+    assert bindings("import './styles.css';\nconst page = import('./Page');\nconst url = import.meta.url;") == []
+
+def test_usage_outside_imports_counts():
+    source = (
+        "import { Used, InComment, InString, InTemplate, InJsx } from './x';\n"
+        "// InComment\n"
+        "const s = 'InString';\n"
+        "const t = `InTemplate ${Used}`;\n"
+        "export const C = () => <InJsx />;\n"
+    )
+    assert unused(source) == ['InComment', 'InString', 'InTemplate']
+
+def test_apostrophes_in_jsx_text_are_not_strings():
+    source = "import { A } from './a';\nexport const C = () => <p>Don't click <A/> it's</p>;\n"
+    assert unused(source) == []
+
+def test_regex_literals_do_not_open_templates_or_strings():
+    source = (
+        "import { clean } from './clean';\n"
+        "const s = text.replace(/`/g, '').split(/[/\"']/);\n"
+        "export default clean(s);\n"
+    )
+    assert unused(source) == []
+    assert ('regex', '/`/g', source.index('/`/g')) in tokenize(source)
+
+def test_division_is_not_a_regex():
+    tokens = tokenize("const r = a / b / c;")
+    assert all(kind != 'regex' for kind, _, _ in tokens)